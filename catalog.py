@@ -0,0 +1,374 @@
+"""
+This module defines a binary catalog format that worker processes can
+memory-map to share one read-only copy of the store's products.
+
+File layout (little endian):
+
+    header      magic, version, product count, promotion count and the
+                offsets of the sections below
+    records     one fixed-width record per product: price, quantity,
+                maximum, promotion id, flags and the name's position
+                in the string table
+    promotions  the position of each promotion name in the string table,
+                promotion id 1 is the first entry, 0 means no promotion
+    index       (name hash, record number) pairs sorted by hash, for binary
+                search without copying names out of the map
+    strings     UTF-8 product and promotion names
+"""
+
+import mmap
+import os
+import struct
+import zlib
+
+import products
+
+MAGIC = b"BBYC"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHxxIIIII")
+RECORD = struct.Struct("<dqIHBxII")
+STRING = struct.Struct("<II")
+INDEX = struct.Struct("<II")
+
+ACTIVE = 1
+NON_STOCKED = 2
+LIMITED = 4
+INTEGER_PRICE = 8
+
+
+def write_catalog(product_list, path):
+    """
+    Writes the products to a binary catalog file.
+
+    The file is written next to its destination and moved into place, so
+    workers that already mapped the previous catalog keep a consistent copy.
+
+    Args:
+        product_list (list): The products to write.
+        path (str): The path of the catalog file.
+    """
+    strings = bytearray()
+
+    def add_string(text):
+        encoded = text.encode("utf-8")
+        position = STRING.pack(len(strings), len(encoded))
+        strings.extend(encoded)
+        return position
+
+    promotion_ids = {}
+    promotion_entries = []
+    records = []
+    names = []
+    for product in product_list:
+        promotion_id = 0
+        if product.get_promotion():
+            promotion_name = product.get_promotion().get_name()
+            if promotion_name not in promotion_ids:
+                promotion_entries.append(add_string(promotion_name))
+                promotion_ids[promotion_name] = len(promotion_entries)
+            promotion_id = promotion_ids[promotion_name]
+
+        flags = ACTIVE if product.is_active() else 0
+        if isinstance(product.get_price(), int):
+            flags |= INTEGER_PRICE
+        maximum = 0
+        if isinstance(product, products.NonStockedProduct):
+            flags |= NON_STOCKED
+        elif isinstance(product, products.LimitedProduct):
+            flags |= LIMITED
+            maximum = product.get_maximum()
+
+        name_offset, name_length = STRING.unpack(add_string(product.get_name()))
+        names.append(product.get_name().encode("utf-8"))
+        records.append(RECORD.pack(float(product.get_price()), product.get_quantity(),
+                                   maximum, promotion_id, flags, name_offset, name_length))
+
+    index = sorted((zlib.crc32(name), record) for record, name in enumerate(names))
+    records_offset = HEADER.size
+    promotions_offset = records_offset + RECORD.size * len(records)
+    index_offset = promotions_offset + STRING.size * len(promotion_entries)
+    strings_offset = index_offset + INDEX.size * len(index)
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(records), len(promotion_entries),
+                               promotions_offset, index_offset, strings_offset))
+        file.writelines(records)
+        file.writelines(promotion_entries)
+        file.writelines(INDEX.pack(name_hash, record) for name_hash, record in index)
+        file.write(strings)
+    os.replace(temporary_path, path)
+
+
+class MappedCatalog:
+    """
+    A read-only, memory-mapped view of a binary catalog file.
+    """
+
+    def __init__(self, path, promotions=None):
+        """
+        Maps a catalog file into memory.
+
+        Args:
+            path (str): The path of the catalog file.
+            promotions (dict): Optional mapping of promotion names to Promotions,
+                used by ProductView.get_promotion.
+
+        Raises:
+            ValueError: If the file is not a catalog of a supported version.
+        """
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, version, self._count, self._promotion_count, self._promotions_offset, \
+            self._index_offset, self._strings_offset = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("Invalid catalog file")
+        self._promotions = promotions or {}
+
+    def __len__(self):
+        """
+        Returns the number of products in the catalog.
+
+        Returns:
+            int: The number of products.
+        """
+        return self._count
+
+    def __iter__(self):
+        """
+        Iterates over the products in the order they were written.
+
+        Returns:
+            iterator: An iterator of ProductView objects.
+        """
+        return (ProductView(self, record) for record in range(self._count))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Unmaps the catalog file.
+        """
+        self._view.release()
+        self._map.close()
+
+    def get(self, name):
+        """
+        Looks up a product by name with a binary search over the name hashes.
+
+        Args:
+            name (str): The name of the product.
+
+        Returns:
+            ProductView or None: The product, or None if it is not in the catalog.
+        """
+        target = name.encode("utf-8")
+        target_hash = zlib.crc32(target)
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._index_entry(middle)[0] < target_hash:
+                low = middle + 1
+            else:
+                high = middle
+        while low < self._count:
+            name_hash, record = self._index_entry(low)
+            if name_hash != target_hash:
+                break
+            if self._record_name(record) == target:
+                return ProductView(self, record)
+            low += 1
+        return None
+
+    def get_all_products(self):
+        """
+        Retrieves a list of all active products in the catalog.
+
+        Returns:
+            list: A list of active ProductView objects.
+        """
+        return [product for product in self if product.is_active()]
+
+    def _index_entry(self, position):
+        """
+        Returns the (name hash, record number) pair at a position of the index.
+        """
+        return INDEX.unpack_from(self._map, self._index_offset + position * INDEX.size)
+
+    def _record(self, record):
+        """
+        Unpacks a product record.
+        """
+        return RECORD.unpack_from(self._map, HEADER.size + record * RECORD.size)
+
+    def _record_name(self, record):
+        """
+        Returns the encoded name of a product record as a view into the map.
+        """
+        offset, length = STRING.unpack_from(
+            self._map, HEADER.size + (record + 1) * RECORD.size - STRING.size)
+        return self._string(offset, length)
+
+    def _string(self, offset, length):
+        """
+        Returns a zero-copy view of bytes in the string table.
+        """
+        start = self._strings_offset + offset
+        return self._view[start:start + length]
+
+    def _promotion_name(self, promotion_id):
+        """
+        Returns the name of a promotion id.
+        """
+        offset, length = STRING.unpack_from(
+            self._map, self._promotions_offset + (promotion_id - 1) * STRING.size)
+        return str(self._string(offset, length), "utf-8")
+
+
+class ProductView:
+    """
+    A read-only product backed by a record of a MappedCatalog.
+
+    Provides the same getters as Product. Methods that would change the
+    product raise a ValueError.
+    """
+
+    def __init__(self, catalog, record):
+        """
+        Initializes a view of a catalog record.
+
+        Args:
+            catalog (MappedCatalog): The catalog the record belongs to.
+            record (int): The record number.
+        """
+        self._catalog = catalog
+        self._index = record
+
+    def _field(self, position):
+        """
+        Returns a field of the product record.
+        """
+        return self._catalog._record(self._index)[position]
+
+    def get_name(self):
+        """
+        Returns the name of the product.
+
+        Returns:
+            str: The name of the product.
+        """
+        return str(self._catalog._record_name(self._index), "utf-8")
+
+    def get_price(self):
+        """
+        Returns the price of the product.
+
+        Returns:
+            int or float: The price of the product, with the type it was written with.
+        """
+        record = self._catalog._record(self._index)
+        return int(record[0]) if record[4] & INTEGER_PRICE else record[0]
+
+    def get_quantity(self):
+        """
+        Returns the quantity of the product.
+
+        Returns:
+            int: The quantity of the product.
+        """
+        return self._field(1)
+
+    def get_maximum(self):
+        """
+        Returns the maximum purchase limit of a limited product.
+
+        Returns:
+            int or None: The maximum purchase limit, or None if the product is not limited.
+        """
+        record = self._catalog._record(self._index)
+        return record[2] if record[4] & LIMITED else None
+
+    def is_active(self):
+        """
+        Checks if the product is active.
+
+        Returns:
+            bool: True if the product is active, False otherwise.
+        """
+        return bool(self._field(4) & ACTIVE)
+
+    def is_non_stocked(self):
+        """
+        Checks if the product is a non-stocked product.
+
+        Returns:
+            bool: True if the product is non-stocked, False otherwise.
+        """
+        return bool(self._field(4) & NON_STOCKED)
+
+    def get_inventory(self):
+        """
+        Returns the per-location inventory of the product. Catalog products
+        are never stocked by location.
+
+        Returns:
+            None: Always None.
+        """
+        return None
+
+    def get_promotion_name(self):
+        """
+        Returns the name of the promotion applied to the product.
+
+        Returns:
+            str or None: The promotion name, or None if no promotion is applied.
+        """
+        promotion_id = self._field(3)
+        if not promotion_id:
+            return None
+        return self._catalog._promotion_name(promotion_id)
+
+    def get_promotion(self):
+        """
+        Returns the promotion applied to the product, looked up by name in the
+        promotions the catalog was opened with.
+
+        Returns:
+            Promotions or None: The promotion applied to the product,
+            or None if no promotion is applied or it was not provided.
+        """
+        promotion_name = self.get_promotion_name()
+        if promotion_name is None:
+            return None
+        return self._catalog._promotions.get(promotion_name)
+
+    def show(self):
+        """
+        Returns a string representation of the product.
+
+        Returns:
+            str: A string representation of the product, formatted like Product.show().
+        """
+        details = f"{self.get_name()}, Price: £{self.get_price()}"
+        if not self.is_non_stocked():
+            details += f", Quantity: {self.get_quantity()}"
+        if self.get_maximum() is not None:
+            details += f", Maximum: {self.get_maximum()}"
+        if self.get_promotion_name():
+            details += f", Promotion: {self.get_promotion_name()}"
+        return details
+
+    def _read_only(self, *args):
+        """
+        Rejects any change to the product.
+        """
+        raise ValueError("Catalog products are read-only")
+
+    set_quantity = set_price = set_promotion = activate = deactivate = buy = _read_only
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 36000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def slow_buy(monkeypatch):
+    def slow_down(product, delay=0.05):
+        original_buy = product.buy
+
+        def buy(quantity, **options):
+            time.sleep(delay)
+            return original_buy(quantity, **options)
+
+        monkeypatch.setattr(product, "buy", buy)
+    return slow_down
+
+
+@pytest.fixture
+def run_concurrently():
+    def run(function, count):
+        results = []
+
+        def call():
+            try:
+                results.append(function())
+            except ValueError:
+                results.append(None)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+    return run
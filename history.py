@@ -0,0 +1,252 @@
+"""
+This module defines the OrderHistory class that records committed order
+lines and keeps sales rollups per product and time bucket.
+
+Order lines are appended to typed arrays, one per column, with product and
+promotion names interned to small integer ids. When a spill path is given,
+full columns are appended to that file and cleared from memory. Every line
+also updates the rollup of its product and time bucket (units, revenue and
+discount given by each promotion), so sales reports read the rollups and
+never scan the raw lines. Only the most recent buckets are kept, so the
+rollups use a bounded amount of memory however long the store runs.
+
+A lock serialises recording and reading, so orders placed concurrently are
+all recorded.
+"""
+
+import math
+import struct
+import threading
+import time
+from array import array
+
+SPILL_HEADER = struct.Struct("<I")
+
+COLUMNS = (
+    ("timestamps", "d"),
+    ("product_ids", "I"),
+    ("quantities", "q"),
+    ("revenues", "d"),
+    ("discounts", "d"),
+    ("promotion_ids", "I"),
+)
+
+
+class OrderHistory:
+    """
+    An append-only, columnar history of order lines with time-bucketed rollups.
+    """
+
+    def __init__(self, bucket_seconds=300, retention_buckets=2016, spill_path=None,
+                 spill_threshold=100000, clock=time.time):
+        """
+        Initializes a new OrderHistory instance.
+
+        Args:
+            bucket_seconds (float): The length of each rollup bucket in seconds.
+            retention_buckets (int): The number of most recent buckets whose rollups
+                are kept. The defaults keep one week of five minute buckets.
+            spill_path (str): Optional path of the file order lines are spilled to.
+                The file is truncated, as names are only kept in memory.
+            spill_threshold (int): The number of lines kept in memory before spilling.
+            clock (callable): Returns the current time in seconds.
+
+        Raises:
+            ValueError: If the bucket length, retention or spill threshold is not positive.
+        """
+        if bucket_seconds <= 0 or retention_buckets < 1 or spill_threshold < 1:
+            raise ValueError("Invalid input for order history")
+        self._bucket_seconds = bucket_seconds
+        self._retention_buckets = retention_buckets
+        self._spill_path = spill_path
+        self._spill_threshold = spill_threshold
+        self._clock = clock
+        self._columns = {name: array(typecode) for name, typecode in COLUMNS}
+        self._spilled = 0
+        self._names = {}
+        self._name_list = [None]
+        self._rollups = {}
+        self._lock = threading.Lock()
+        if spill_path is not None:
+            open(spill_path, "wb").close()
+
+    def __len__(self):
+        """
+        Returns the number of order lines recorded, including spilled lines.
+
+        Returns:
+            int: The number of order lines.
+        """
+        return self._spilled + len(self._columns["timestamps"])
+
+    def record(self, product_name, quantity, revenue, discount=0.0, promotion_name=None):
+        """
+        Records a committed order line.
+
+        Args:
+            product_name (str): The name of the product.
+            quantity (int): The quantity bought.
+            revenue (float): The amount paid for the line.
+            discount (float): The amount taken off the full price by the promotion.
+            promotion_name (str): The name of the promotion applied, if any.
+        """
+        with self._lock:
+            timestamp = self._clock()
+            product_id = self._intern(product_name)
+            promotion_id = self._intern(promotion_name) if promotion_name else 0
+            for (name, _), value in zip(COLUMNS, (timestamp, product_id, quantity, revenue,
+                                                  discount, promotion_id)):
+                self._columns[name].append(value)
+
+            bucket = int(timestamp // self._bucket_seconds)
+            rollups = self._rollups.get(bucket)
+            if rollups is None:
+                rollups = self._rollups[bucket] = {}
+                self._prune()
+            rollup = rollups.get(product_id)
+            if rollup is None:
+                rollup = rollups[product_id] = [0, 0.0, {}]
+            rollup[0] += quantity
+            rollup[1] += revenue
+            if promotion_id:
+                rollup[2][promotion_id] = rollup[2].get(promotion_id, 0.0) + discount
+
+            if self._spill_path is not None \
+                    and len(self._columns["timestamps"]) >= self._spill_threshold:
+                self._spill()
+
+    def get_sales(self, product_name, seconds=3600):
+        """
+        Returns the sales of a product in the last seconds.
+
+        Sales are read from whole buckets: the current bucket and the ones before
+        it up to the given number of seconds, so the period covered starts at a
+        bucket boundary and may be up to one bucket shorter than requested.
+
+        Args:
+            product_name (str): The name of the product.
+            seconds (float): How far back to look.
+
+        Returns:
+            dict: The units sold, the revenue and the discount given by each promotion.
+        """
+        sales = {"units": 0, "revenue": 0.0, "discounts": {}}
+        with self._lock:
+            product_id = self._names.get(product_name)
+            if product_id is None:
+                return sales
+            for rollups in self._recent_buckets(seconds):
+                rollup = rollups.get(product_id)
+                if rollup is None:
+                    continue
+                sales["units"] += rollup[0]
+                sales["revenue"] += rollup[1]
+                for promotion_id, discount in rollup[2].items():
+                    promotion_name = self._name_list[promotion_id]
+                    sales["discounts"][promotion_name] = \
+                        sales["discounts"].get(promotion_name, 0.0) + discount
+        return sales
+
+    def top_sellers(self, seconds=3600, limit=10, by="units"):
+        """
+        Returns the best selling products in the last seconds.
+
+        Like get_sales, the period covered is aligned to whole buckets.
+
+        Args:
+            seconds (float): How far back to look.
+            limit (int): The maximum number of products returned.
+            by (str): "units" or "revenue".
+
+        Returns:
+            list: A list of (product name, amount) tuples, best seller first.
+
+        Raises:
+            ValueError: If the ranking is neither units nor revenue.
+        """
+        if by not in ("units", "revenue"):
+            raise ValueError("Top sellers can be ranked by units or revenue")
+        position = 0 if by == "units" else 1
+        totals = {}
+        with self._lock:
+            for rollups in self._recent_buckets(seconds):
+                for product_id, rollup in rollups.items():
+                    totals[product_id] = totals.get(product_id, 0) + rollup[position]
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self._name_list[product_id], amount) for product_id, amount in ranked]
+
+    def iter_lines(self):
+        """
+        Iterates over the order lines recorded when iteration starts, spilled
+        lines first.
+
+        Returns:
+            iterator: An iterator of (timestamp, product name, quantity, revenue,
+            discount, promotion name) tuples.
+        """
+        with self._lock:
+            spilled = self._spilled
+            columns = [self._columns[name][:] for name, _ in COLUMNS]
+        if spilled:
+            with open(self._spill_path, "rb") as file:
+                while spilled:
+                    count = SPILL_HEADER.unpack(file.read(SPILL_HEADER.size))[0]
+                    spilled -= count
+                    spilled_columns = []
+                    for _, typecode in COLUMNS:
+                        column = array(typecode)
+                        column.fromfile(file, count)
+                        spilled_columns.append(column)
+                    yield from self._lines(spilled_columns)
+        yield from self._lines(columns)
+
+    def _lines(self, columns):
+        """
+        Turns columns into order line tuples with names resolved.
+        """
+        for timestamp, product_id, quantity, revenue, discount, promotion_id in zip(*columns):
+            yield (timestamp, self._name_list[product_id], quantity, revenue, discount,
+                   self._name_list[promotion_id])
+
+    def _recent_buckets(self, seconds):
+        """
+        Returns the rollups of the current bucket and the buckets before it
+        that fit in the last seconds.
+        """
+        last = int(self._clock() // self._bucket_seconds)
+        first = last - max(1, math.ceil(seconds / self._bucket_seconds)) + 1
+        if last - first + 1 > len(self._rollups):
+            return [rollups for bucket, rollups in self._rollups.items() if first <= bucket <= last]
+        return [self._rollups[bucket] for bucket in range(first, last + 1)
+                if bucket in self._rollups]
+
+    def _prune(self):
+        """
+        Drops the rollups of buckets older than the retention period. Buckets
+        are compared by number, as they are out of order if the clock steps back.
+        """
+        cutoff = max(self._rollups) - self._retention_buckets
+        for bucket in [bucket for bucket in self._rollups if bucket <= cutoff]:
+            del self._rollups[bucket]
+
+    def _intern(self, name):
+        """
+        Returns the id of a name, assigning a new one the first time it is seen.
+        """
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names[name] = len(self._name_list)
+            self._name_list.append(name)
+        return name_id
+
+    def _spill(self):
+        """
+        Appends the in-memory columns to the spill file and clears them.
+        """
+        count = len(self._columns["timestamps"])
+        with open(self._spill_path, "ab") as file:
+            file.write(SPILL_HEADER.pack(count))
+            for name, typecode in COLUMNS:
+                self._columns[name].tofile(file)
+                self._columns[name] = array(typecode)
+        self._spilled += count
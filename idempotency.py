@@ -0,0 +1,209 @@
+"""
+This module defines the IdempotencyCache class used to deduplicate retried
+orders in the store.
+
+A cache entry maps an idempotency key to the result of the order that was
+placed with it. Entries expire after a time-to-live and the least recently
+used entry is evicted once the cache is full. When a persistence path is
+given, entries are appended to a JSON lines file that is replayed on startup
+and compacted whenever it grows to twice the size of the cache.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class IdempotencyCache:
+    """
+    A bounded, thread-safe cache of order results keyed by idempotency key.
+    """
+
+    def __init__(self, max_size=10000, ttl=3600, path=None, clock=time.time):
+        """
+        Initializes a new IdempotencyCache instance.
+
+        Args:
+            max_size (int): The maximum number of keys kept in memory.
+            ttl (float): The number of seconds a result is remembered for.
+            path (str): Optional path of the file used to persist entries.
+            clock (callable): Returns the current time in seconds.
+
+        Raises:
+            ValueError: If the maximum size or the time-to-live is not positive.
+        """
+        if max_size < 1 or ttl <= 0:
+            raise ValueError("Invalid input for idempotency cache")
+        self._max_size = max_size
+        self._ttl = ttl
+        self._path = path
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._file_lines = 0
+        if path is not None:
+            self._load()
+
+    def __len__(self):
+        """
+        Returns the number of keys currently held in the cache.
+
+        Returns:
+            int: The number of cached keys.
+        """
+        return len(self._entries)
+
+    def get(self, key, fingerprint=None):
+        """
+        Returns the cached result for a key.
+
+        Args:
+            key (str): The idempotency key.
+            fingerprint: Optional JSON serialisable description of the request.
+
+        Returns:
+            The cached result, or None if the key is unknown or has expired.
+
+        Raises:
+            ValueError: If the key was used with a different fingerprint.
+        """
+        with self._lock:
+            return self._get(key, fingerprint)
+
+    def put(self, key, result, fingerprint=None):
+        """
+        Stores the result for a key, evicting the least recently used entry
+        if the cache is full.
+
+        Args:
+            key (str): The idempotency key.
+            result: The JSON serialisable result to remember.
+            fingerprint: Optional JSON serialisable description of the request.
+        """
+        with self._lock:
+            self._put(key, result, fingerprint)
+
+    def get_or_compute(self, key, compute, fingerprint=None):
+        """
+        Returns the cached result for a key, computing it if necessary.
+
+        Concurrent callers using the same key wait for the first caller to
+        finish instead of computing the result a second time. If the
+        computation raises, nothing is cached and the next caller retries.
+
+        Args:
+            key (str): The idempotency key.
+            compute (callable): Computes the result when it is not cached.
+            fingerprint: Optional JSON serialisable description of the request,
+                compared with the one stored for the key.
+
+        Returns:
+            The cached or newly computed result.
+
+        Raises:
+            ValueError: If the key was used with a different fingerprint.
+        """
+        while True:
+            with self._lock:
+                result = self._get(key, fingerprint)
+                if result is not None:
+                    return result
+                event = self._in_flight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._in_flight[key] = event
+                    break
+            event.wait()
+
+        try:
+            result = compute()
+            with self._lock:
+                self._put(key, result, fingerprint)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            event.set()
+
+    def _get(self, key, fingerprint):
+        """
+        Looks up a key while the lock is held, dropping it if it has expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        result, expires_at, stored_fingerprint = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        if stored_fingerprint != fingerprint:
+            raise ValueError("Idempotency key was already used for a different order")
+        self._entries.move_to_end(key)
+        return result
+
+    def _put(self, key, result, fingerprint):
+        """
+        Stores a key while the lock is held and appends it to the persistence file,
+        compacting the file once it holds twice as many lines as the cache.
+        """
+        expires_at = self._clock() + self._ttl
+        self._store(key, result, expires_at, fingerprint)
+        if self._path is not None:
+            with open(self._path, "a", encoding="utf-8") as file:
+                file.write(self._line(key, (result, expires_at, fingerprint)))
+            self._file_lines += 1
+            if self._file_lines > 2 * self._max_size:
+                self._compact()
+
+    def _store(self, key, result, expires_at, fingerprint):
+        """
+        Inserts an entry in memory and evicts the least recently used entries.
+        """
+        self._entries[key] = (result, expires_at, fingerprint)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _line(key, entry):
+        """
+        Returns the persistence file line of an entry.
+        """
+        result, expires_at, fingerprint = entry
+        return json.dumps({"key": key, "result": result, "expires_at": expires_at,
+                           "fingerprint": fingerprint}) + "\n"
+
+    def _load(self):
+        """
+        Replays the persistence file and rewrites it without expired or evicted entries.
+        """
+        if not os.path.exists(self._path):
+            return
+        now = self._clock()
+        with open(self._path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record["expires_at"] > now:
+                    self._store(record["key"], record["result"], record["expires_at"],
+                                record.get("fingerprint"))
+        self._compact()
+
+    def _compact(self):
+        """
+        Rewrites the persistence file with only the live entries.
+        """
+        now = self._clock()
+        temporary_path = self._path + ".tmp"
+        self._file_lines = 0
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            for key, entry in self._entries.items():
+                if entry[1] > now:
+                    file.write(self._line(key, entry))
+                    self._file_lines += 1
+        os.replace(temporary_path, self._path)
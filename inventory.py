@@ -0,0 +1,307 @@
+"""
+This module defines the Inventory class that tracks a product's stock across
+several locations, and the strategies used to choose which locations an
+order is fulfilled from.
+
+Inventory keeps the total stock cached and heaps of the locations holding
+stock: one by stock level and one by distance for each destination orders
+are shipped to. Entries are invalidated lazily, so stock changes and
+allocations cost O(log locations) per location touched instead of a scan
+over every location. A lock keeps the heaps consistent when several orders
+take stock at once.
+"""
+
+import heapq
+import threading
+
+
+class NearestLocation:
+    """
+    Fulfils an order from the locations nearest to its destination first,
+    splitting it when the nearest location does not have enough stock.
+    """
+
+    def __init__(self, routes=None):
+        """
+        Initializes a new NearestLocation strategy.
+
+        Args:
+            routes (dict): Optional distances from each location to each destination,
+                as {destination: {location: distance}}. Orders without a destination,
+                or to a destination missing from the routes, use the distances the
+                inventory was created with.
+        """
+        self._routes = routes or {}
+
+    def allocate(self, inventory, quantity, destination=None):
+        """
+        Chooses the locations to take the quantity from.
+
+        Args:
+            inventory (Inventory): The inventory to allocate from.
+            quantity (int): The quantity to allocate.
+            destination (str): Optional destination of the order.
+
+        Returns:
+            list: A list of (location, quantity) tuples.
+
+        Raises:
+            ValueError: If there is not enough stock.
+        """
+        if destination not in self._routes:
+            return inventory.allocate_by_distance(quantity)
+        return inventory.allocate_by_distance(quantity, destination=destination,
+                                              distances=self._routes[destination])
+
+
+class MostStock:
+    """
+    Fulfils an order in a single shipment from the location with the most stock.
+    """
+
+    def allocate(self, inventory, quantity, destination=None):
+        """
+        Chooses the location to take the quantity from.
+
+        Args:
+            inventory (Inventory): The inventory to allocate from.
+            quantity (int): The quantity to allocate.
+            destination (str): The destination of the order (unused).
+
+        Returns:
+            list: A list of (location, quantity) tuples.
+        """
+        return inventory.allocate_by_stock(quantity, split=False)
+
+
+class SplitShipment:
+    """
+    Fulfils an order from as few locations as possible, taking from the
+    locations with the most stock first.
+    """
+
+    def allocate(self, inventory, quantity, destination=None):
+        """
+        Chooses the locations to take the quantity from.
+
+        Args:
+            inventory (Inventory): The inventory to allocate from.
+            quantity (int): The quantity to allocate.
+            destination (str): The destination of the order (unused).
+
+        Returns:
+            list: A list of (location, quantity) tuples.
+        """
+        return inventory.allocate_by_stock(quantity, split=True)
+
+
+class Inventory:
+    """
+    Represents the stock of a product held in several locations.
+    """
+
+    def __init__(self, stock, distances=None, strategy=None):
+        """
+        Initializes a new Inventory instance.
+
+        Args:
+            stock (dict): The quantity held in each location.
+            distances (dict): Optional default distance of each location, used by
+                NearestLocation for orders without a destination.
+            strategy: The default allocation strategy, NearestLocation by default.
+
+        Raises:
+            ValueError: If there are no locations or a quantity is negative.
+        """
+        if not stock or any(quantity < 0 for quantity in stock.values()):
+            raise ValueError("Invalid input for inventory")
+        self._stock = {}
+        self._distances = dict(distances or {})
+        self._strategy = strategy or NearestLocation()
+        self._total = 0
+        self._nearest = None
+        self._by_distance = {None: (self._distances, [])}
+        self._by_stock = []
+        self._lock = threading.RLock()
+        for location, quantity in stock.items():
+            self.set_location_quantity(location, quantity)
+
+    def get_quantity(self):
+        """
+        Returns the total quantity across all locations.
+
+        Returns:
+            int: The total quantity.
+        """
+        return self._total
+
+    def get_location_quantity(self, location):
+        """
+        Returns the quantity held in a location.
+
+        Args:
+            location (str): The location.
+
+        Returns:
+            int: The quantity held there, 0 for unknown locations.
+        """
+        return self._stock.get(location, 0)
+
+    def get_location_quantities(self):
+        """
+        Returns the quantity held in every location.
+
+        Returns:
+            dict: The quantity held in each location.
+        """
+        return dict(self._stock)
+
+    def set_strategy(self, strategy):
+        """
+        Sets the default allocation strategy.
+
+        Args:
+            strategy: An object with an allocate(inventory, quantity, destination) method.
+        """
+        self._strategy = strategy
+
+    def set_location_quantity(self, location, quantity):
+        """
+        Sets the quantity held in a location, adding the location if it is new.
+
+        Args:
+            location (str): The location.
+            quantity (int): The new quantity.
+        """
+        with self._lock:
+            self._set_location_quantity(location, quantity)
+
+    def _set_location_quantity(self, location, quantity):
+        """
+        Sets the quantity held in a location and pushes it onto the heaps.
+        """
+        if quantity < 0:
+            return
+        if location not in self._stock:
+            self._distances.setdefault(location, 0)
+            home = (self._distances[location], location)
+            if self._nearest is None or home < self._nearest:
+                self._nearest = home
+        previous = self._stock.get(location, 0)
+        self._stock[location] = quantity
+        self._total += quantity - previous
+        if quantity > 0:
+            if previous == 0:
+                for distances, heap in self._by_distance.values():
+                    heapq.heappush(heap, (distances.get(location, float("inf")), location))
+            heapq.heappush(self._by_stock, (-quantity, location))
+            if len(self._by_stock) > 2 * len(self._stock) + 16:
+                self._by_stock = [(-stock, name) for name, stock in self._stock.items() if stock]
+                heapq.heapify(self._by_stock)
+
+    def add(self, quantity, location=None):
+        """
+        Adds stock to a location.
+
+        Args:
+            quantity (int): The quantity to add.
+            location (str): The location, the nearest location by default.
+        """
+        with self._lock:
+            if location is None:
+                location = self._nearest[1]
+            self._set_location_quantity(location, self.get_location_quantity(location) + quantity)
+
+    def remove(self, quantity, strategy=None, destination=None):
+        """
+        Removes stock using an allocation strategy.
+
+        Args:
+            quantity (int): The quantity to remove.
+            strategy: Optional allocation strategy, the inventory's strategy by default.
+            destination (str): Optional destination of the order.
+
+        Returns:
+            list: A list of (location, quantity) tuples the stock was taken from.
+
+        Raises:
+            ValueError: If the strategy cannot allocate the quantity.
+        """
+        with self._lock:
+            allocation = (strategy or self._strategy).allocate(self, quantity, destination)
+            for location, taken in allocation:
+                self._set_location_quantity(location, self._stock[location] - taken)
+        return allocation
+
+    def allocate_by_distance(self, quantity, split=True, destination=None, distances=None):
+        """
+        Allocates a quantity from the nearest locations with stock.
+
+        Args:
+            quantity (int): The quantity to allocate.
+            split (bool): Whether the quantity may come from several locations.
+            destination (str): Optional destination the distances are measured from.
+            distances (dict): The distance of each location from the destination.
+                Locations missing from it are used last.
+
+        Returns:
+            list: A list of (location, quantity) tuples.
+
+        Raises:
+            ValueError: If there is not enough stock.
+        """
+        with self._lock:
+            cached = self._by_distance.get(destination)
+            if cached is None or (distances is not None and cached[0] is not distances):
+                heap = [(distances.get(location, float("inf")), location)
+                        for location, stock in self._stock.items() if stock]
+                heapq.heapify(heap)
+                self._by_distance[destination] = (distances, heap)
+            distances, heap = self._by_distance[destination]
+            return self._allocate(heap, lambda location: distances.get(location, float("inf")),
+                                  quantity, split)
+
+    def allocate_by_stock(self, quantity, split=True):
+        """
+        Allocates a quantity from the locations with the most stock.
+
+        Args:
+            quantity (int): The quantity to allocate.
+            split (bool): Whether the quantity may come from several locations.
+
+        Returns:
+            list: A list of (location, quantity) tuples.
+
+        Raises:
+            ValueError: If there is not enough stock.
+        """
+        with self._lock:
+            return self._allocate(self._by_stock, lambda location: -self._stock[location],
+                                  quantity, split)
+
+    def _allocate(self, heap, priority, quantity, split):
+        """
+        Pops locations off a heap in priority order until the quantity is
+        covered, dropping stale entries, then pushes the valid entries back.
+        """
+        allocation = []
+        valid = []
+        seen = set()
+        remaining = quantity
+        while remaining > 0 and heap:
+            entry = heapq.heappop(heap)
+            location = entry[1]
+            if location in seen or self._stock[location] == 0 or entry[0] != priority(location):
+                continue
+            seen.add(location)
+            valid.append(entry)
+            taken = min(self._stock[location], remaining)
+            if not split and taken < remaining:
+                break
+            allocation.append((location, taken))
+            remaining -= taken
+        for entry in valid:
+            heapq.heappush(heap, entry)
+        if remaining > 0:
+            raise ValueError("Insufficient quantity available")
+        return allocation
@@ -0,0 +1,174 @@
+"""
+This module defines the PurchaseLimiter class that enforces per-customer
+purchase limits on limited products over a sliding time window.
+
+Each limited product owns a ring of time slices covering its window, and
+each slice holds a dict of the units every customer bought during it.
+Checking and recording a purchase therefore costs a constant amount of work
+no matter how many orders the customer has placed.
+
+Slices expire as a whole once they leave the window, so memory only holds
+the customers who bought within a window, one small dict entry per customer
+and slice, and no customer is ever forgotten while their purchases still count.
+"""
+
+import threading
+import time
+from collections import deque
+
+import products
+
+
+class PurchaseLimiter:
+    """
+    Tracks how many units of each limited product every customer has bought recently.
+
+    Orders are checked and recorded in one step with reserve(), so concurrent
+    orders from the same customer cannot all pass the check. A reservation is
+    given back with release() if the order fails.
+    """
+
+    def __init__(self, buckets=24, clock=time.time):
+        """
+        Initializes a new PurchaseLimiter instance.
+
+        Args:
+            buckets (int): The number of slices each window is divided into.
+            clock (callable): Returns the current time in seconds.
+
+        Raises:
+            ValueError: If the number of buckets is less than 1.
+
+        Note:
+            The window slides one slice at a time, so a purchase stops counting
+            between window - window / buckets and window seconds after it was made.
+        """
+        if buckets < 1:
+            raise ValueError("Invalid input for purchase limiter")
+        self._buckets = buckets
+        self._clock = clock
+        self._rings = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Returns the number of (customer, product, slice) counters currently held.
+
+        Returns:
+            int: The number of counters within their window.
+        """
+        with self._lock:
+            return sum(len(counts) for ring_key in list(self._rings)
+                       for _, counts in self._live_slices(ring_key))
+
+    def get_purchased(self, customer_id, product):
+        """
+        Returns how many units of a product the customer bought in the current window.
+
+        Args:
+            customer_id (str): The customer identifier.
+            product (LimitedProduct): The product to look up.
+
+        Returns:
+            int: The number of units bought within the product's window.
+        """
+        with self._lock:
+            return self._purchased(self._ring_key(product), customer_id)
+
+    def reserve(self, customer_id, shopping_list):
+        """
+        Checks that an order keeps the customer within every product's limit
+        and records it, as one atomic step.
+
+        Args:
+            customer_id (str): The customer identifier.
+            shopping_list (list): A list of tuples containing a product and its desired quantity.
+
+        Returns:
+            list: The reservation, to pass to release() if the order fails.
+
+        Raises:
+            ValueError: If the order would exceed a product's per-customer limit.
+        """
+        requested = {}
+        for product, quantity in shopping_list:
+            if self._is_limited(product):
+                requested[product] = requested.get(product, 0) + quantity
+        if not requested:
+            return []
+
+        with self._lock:
+            for product, quantity in requested.items():
+                purchased = self._purchased(self._ring_key(product), customer_id)
+                if purchased + quantity > product.get_customer_limit():
+                    raise ValueError(f"You can only get {product.get_customer_limit()} "
+                                     f"of this item per customer")
+
+            reservation = []
+            for product, quantity in requested.items():
+                ring_key = self._ring_key(product)
+                ring = self._rings.setdefault(ring_key, deque())
+                current = self._slice(ring_key[1])
+                if not ring or ring[-1][0] < current:
+                    ring.append((current, {}))
+                index, counts = ring[-1]
+                counts[customer_id] = counts.get(customer_id, 0) + quantity
+                reservation.append((ring_key, index, customer_id, quantity))
+            return reservation
+
+    def release(self, reservation):
+        """
+        Gives back a reservation made by reserve().
+
+        Args:
+            reservation (list): The reservation returned by reserve().
+        """
+        with self._lock:
+            for ring_key, index, customer_id, quantity in reservation:
+                for slice_index, counts in self._live_slices(ring_key):
+                    if slice_index != index:
+                        continue
+                    remaining = counts.get(customer_id, 0) - quantity
+                    if remaining > 0:
+                        counts[customer_id] = remaining
+                    else:
+                        counts.pop(customer_id, None)
+
+    @staticmethod
+    def _is_limited(product):
+        """
+        Returns True if the product has a per-customer limit.
+        """
+        return isinstance(product, products.LimitedProduct) \
+            and product.get_customer_limit() is not None
+
+    @staticmethod
+    def _ring_key(product):
+        """
+        Returns the key of the ring tracking a product.
+        """
+        return product.get_name(), product.get_window()
+
+    def _slice(self, window):
+        """
+        Returns the index of the current slice of a window.
+        """
+        return int(self._clock() * self._buckets // window)
+
+    def _live_slices(self, ring_key):
+        """
+        Drops the slices of a ring that left the window and returns the ring.
+        """
+        ring = self._rings.get(ring_key)
+        if ring is None:
+            return ()
+        oldest = self._slice(ring_key[1]) - self._buckets + 1
+        while ring and ring[0][0] < oldest:
+            ring.popleft()
+        return ring
+
+    def _purchased(self, ring_key, customer_id):
+        """
+        Returns the units a customer bought within the window of a ring.
+        """
+        return sum(counts.get(customer_id, 0) for _, counts in self._live_slices(ring_key))
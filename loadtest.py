@@ -0,0 +1,381 @@
+"""
+A load-generation harness that drives Store.order with synthetic orders
+and optionally profiles the run.
+
+Each run writes its results to its own directory:
+
+    summary.json    order count, concurrency, latency percentiles and commit
+    hotspots.txt    the functions that took the most time
+    profile.prof    the cProfile statistics (--profiler cprofile)
+    stacks.folded   collapsed stacks for flame graphs (--profiler sampling)
+
+Example:
+    python loadtest.py --orders 20000 --concurrency 4 --profiler sampling
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from products import Product, NonStockedProduct, LimitedProduct
+from promotions import SecondHalfPrice, PercentDiscount, ThirdOneFree
+from store import Store
+
+REPO_MODULES = r"(products|promotions|store)\.py"
+
+# From Python 3.12 cProfile is built on sys.monitoring, which is interpreter-wide:
+# a single profiler sees every thread and a second one cannot be enabled.
+CPROFILE_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+PROMOTION_FACTORIES = {
+    "none": lambda: None,
+    "second_half_price": lambda: SecondHalfPrice("Second Half price!"),
+    "third_one_free": lambda: ThirdOneFree("Third One Free!"),
+    "percent_off": lambda: PercentDiscount("30% off!", percent=30),
+}
+
+PRODUCT_KINDS = ("stocked", "non_stocked", "limited")
+
+
+def parse_mix(text, known):
+    """
+    Parses a mix such as "stocked=3,limited=1" into a dict of weights.
+
+    Args:
+        text (str): The comma separated name=weight pairs.
+        known (iterable): The accepted names.
+
+    Returns:
+        dict: The weight of every name in the mix.
+
+    Raises:
+        ValueError: If a name is unknown or a weight is not a positive integer.
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in known:
+            raise ValueError(f"Unknown mix entry {name!r}")
+        mix[name] = int(weight or 1)
+        if mix[name] < 1:
+            raise ValueError(f"Invalid weight for {name!r}")
+    return mix
+
+
+def build_store(product_mix, promotion_mix, seed=0):
+    """
+    Builds a store with one product per unit of weight in the product mix.
+
+    Products are given enough stock that a run never sells out, and a
+    promotion picked from the promotion mix.
+
+    Args:
+        product_mix (dict): The number of products of each kind.
+        promotion_mix (dict): The relative weight of each promotion.
+        seed (int): The seed for picking promotions.
+
+    Returns:
+        Store: The store.
+    """
+    generator = random.Random(seed)
+    names = list(promotion_mix)
+    weights = [promotion_mix[name] for name in names]
+    stock = 10 ** 12
+    product_list = []
+    for kind, count in product_mix.items():
+        for number in range(count):
+            name = f"{kind} product {number + 1}"
+            price = generator.choice([10, 125, 250, 500, 1450])
+            if kind == "non_stocked":
+                product = NonStockedProduct(name, price=price)
+            elif kind == "limited":
+                product = LimitedProduct(name, price=price, quantity=stock, maximum=1)
+            else:
+                product = Product(name, price=price, quantity=stock)
+            product.set_promotion(PROMOTION_FACTORIES[generator.choices(names, weights)[0]]())
+            product_list.append(product)
+    return Store(product_list)
+
+
+def generate_orders(store, count, max_lines=3, max_quantity=5, seed=0):
+    """
+    Generates random shopping lists for the products in a store.
+
+    Args:
+        store (Store): The store to order from.
+        count (int): The number of orders.
+        max_lines (int): The maximum number of products per order.
+        max_quantity (int): The maximum quantity per product.
+        seed (int): The seed for generating orders.
+
+    Returns:
+        list: The shopping lists.
+    """
+    generator = random.Random(seed)
+    product_list = store.get_all_products()
+    orders = []
+    for _ in range(count):
+        line_count = generator.randint(1, min(max_lines, len(product_list)))
+        lines = generator.sample(product_list, line_count)
+        orders.append([(product, 1 if isinstance(product, LimitedProduct)
+                        else generator.randint(1, max_quantity)) for product in lines])
+    return orders
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of a set of threads at a fixed interval.
+    """
+
+    def __init__(self, interval=0.001):
+        """
+        Initializes a new SamplingProfiler instance.
+
+        Args:
+            interval (float): The number of seconds between samples.
+        """
+        self._interval = interval
+        self._thread_ids = set()
+        self._stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def add_current_thread(self):
+        """
+        Adds the calling thread to the set of sampled threads.
+        """
+        self._thread_ids.add(threading.get_ident())
+
+    def start(self):
+        """
+        Starts sampling.
+        """
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling.
+        """
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        """
+        Records the stack of every sampled thread until stopped.
+        """
+        while not self._stop.wait(self._interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in self._thread_ids:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                                 f":{code.co_firstlineno})")
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path):
+        """
+        Writes the samples as collapsed stacks, one "frame;frame;frame count" per line.
+
+        Args:
+            path (str): The path of the output file.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self._stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+    def hotspots(self, limit=20):
+        """
+        Returns a report of the functions seen most often in the samples.
+
+        Args:
+            limit (int): The number of functions per table.
+
+        Returns:
+            str: The report.
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self._stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        samples = sum(self._stacks.values()) or 1
+        lines = [f"{samples} samples", "", "self%   total%  function"]
+        for frame, count in self_counts.most_common(limit):
+            lines.append(f"{100 * count / samples:5.1f}  {100 * total_counts[frame] / samples:6.1f}"
+                         f"  {frame}")
+        return "\n".join(lines) + "\n"
+
+
+def _percentile(sorted_values, percent):
+    """
+    Returns a percentile of a sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+
+
+def _commit():
+    """
+    Returns the current git commit, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(store, orders, concurrency=1, profiler=None, output_dir=None):
+    """
+    Places the orders on the store and reports latencies.
+
+    Orders are shared out between the worker threads. Store is not
+    thread-safe, so stock levels may drift slightly with concurrency above 1,
+    which does not affect the measurements. With the cProfile profiler, each
+    worker is profiled separately before Python 3.12, and one profiler covers
+    the whole pool from Python 3.12.
+
+    Args:
+        store (Store): The store to order from.
+        orders (list): The shopping lists.
+        concurrency (int): The number of worker threads.
+        profiler (str): None, "cprofile" or "sampling".
+        output_dir (str): The directory for the run's files, or None to skip writing them.
+
+    Returns:
+        dict: The run summary.
+
+    Raises:
+        ValueError: If the profiler is unknown or concurrency is less than 1.
+    """
+    if profiler not in (None, "cprofile", "sampling") or concurrency < 1:
+        raise ValueError("Invalid load test settings")
+    profiles = []
+    sampler = SamplingProfiler() if profiler == "sampling" else None
+    shared_profile = None
+    if profiler == "cprofile" and CPROFILE_SEES_ALL_THREADS:
+        shared_profile = cProfile.Profile()
+
+    def worker(chunk):
+        latencies = []
+        profile = None
+        if profiler == "cprofile" and shared_profile is None:
+            profile = cProfile.Profile()
+        if sampler is not None:
+            sampler.add_current_thread()
+        if profile is not None:
+            profile.enable()
+        for shopping_list in chunk:
+            started = time.perf_counter()
+            store.order(shopping_list)
+            latencies.append(time.perf_counter() - started)
+        if profile is not None:
+            profile.disable()
+            profiles.append(profile)
+        return latencies
+
+    if sampler is not None:
+        sampler.start()
+    if shared_profile is not None:
+        shared_profile.enable()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        chunks = [orders[index::concurrency] for index in range(concurrency)]
+        latencies = sorted(latency for chunk in executor.map(worker, chunks)
+                           for latency in chunk)
+    elapsed = time.perf_counter() - started
+    if shared_profile is not None:
+        shared_profile.disable()
+        profiles.append(shared_profile)
+    if sampler is not None:
+        sampler.stop()
+
+    summary = {
+        "commit": _commit(),
+        "orders": len(orders),
+        "concurrency": concurrency,
+        "profiler": profiler,
+        "seconds": elapsed,
+        "orders_per_second": len(orders) / elapsed if elapsed else 0.0,
+        "latency_ms": {f"p{percent}": 1000 * _percentile(latencies, percent)
+                       for percent in (50, 95, 99)},
+    }
+    if output_dir is not None:
+        _write_run(output_dir, summary, profiles, sampler)
+    return summary
+
+
+def _write_run(output_dir, summary, profiles, sampler):
+    """
+    Writes the summary, profile and hotspot report of a run.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
+
+    if profiles:
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(os.path.join(output_dir, "profile.prof"))
+        report = io.StringIO()
+        stats.stream = report
+        stats.sort_stats("tottime").print_stats(20)
+        report.write("\nRepository modules\n")
+        stats.print_stats(REPO_MODULES, 20)
+        with open(os.path.join(output_dir, "hotspots.txt"), "w", encoding="utf-8") as file:
+            file.write(report.getvalue())
+    elif sampler is not None:
+        sampler.write_folded(os.path.join(output_dir, "stacks.folded"))
+        with open(os.path.join(output_dir, "hotspots.txt"), "w", encoding="utf-8") as file:
+            file.write(sampler.hotspots())
+
+
+def main(argv=None):
+    """
+    Run a load test from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Drive Store.order with synthetic load.")
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--lines", type=int, default=3, help="maximum products per order")
+    parser.add_argument("--quantity", type=int, default=5, help="maximum quantity per product")
+    parser.add_argument("--products", default="stocked=3,non_stocked=1,limited=1",
+                        help="product kinds and counts, e.g. stocked=3,limited=1")
+    parser.add_argument("--promotions",
+                        default="none=2,second_half_price=1,third_one_free=1,percent_off=1",
+                        help="promotion weights, e.g. none=2,percent_off=1")
+    parser.add_argument("--profiler", choices=["cprofile", "sampling"])
+    parser.add_argument("--output", default="profiles", help="directory for run results")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    store = build_store(parse_mix(args.products, PRODUCT_KINDS),
+                        parse_mix(args.promotions, PROMOTION_FACTORIES), seed=args.seed)
+    orders = generate_orders(store, args.orders, args.lines, args.quantity, seed=args.seed)
+    output_dir = os.path.join(args.output, time.strftime("run-%Y%m%d-%H%M%S"))
+    summary = run(store, orders, args.concurrency, args.profiler, output_dir)
+    print(json.dumps(summary, indent=2))
+    print(f"Results written to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
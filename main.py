@@ -2,11 +2,15 @@
 A program that simulates a store and allows users to make orders.
 """
 
+import os
+
 from colorama import Fore, Style
 from products import Product, NonStockedProduct, LimitedProduct
-from promotions import SecondHalfPrice, PercentDiscount, ThirdOneFree
+from promotion_rules import PromotionCatalog
 from store import Store
 
+PROMOTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "promotions.json")
+
 
 def start():
     """
@@ -116,19 +120,17 @@ def main():
                     LimitedProduct("Shipping", price=10, quantity=250, maximum=1)
                     ]
 
-    # Create promotion catalog
-    second_half_price = SecondHalfPrice("Second Half price!")
-    third_one_free = ThirdOneFree("Third One Free!")
-    thirty_percent = PercentDiscount("30% off!", percent=30)
-
-    # Add promotions to products
-    product_list[0].set_promotion(second_half_price)
-    product_list[1].set_promotion(third_one_free)
-    product_list[3].set_promotion(thirty_percent)
+    # Load the promotion catalog and add promotions to products
+    promotion_catalog = PromotionCatalog(PROMOTIONS_PATH)
+    promotion_catalog.apply(product_list)
     best_buy = Store(product_list)
     products = best_buy.get_all_products()
 
     while True:
+        try:
+            promotion_catalog.reload_if_changed()
+        except ValueError as error:
+            print(f"{Fore.RED}Promotions not reloaded: {str(error)}{Style.RESET_ALL}")
         start()
         user_choice = input("Please choose a number: ")
 
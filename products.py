@@ -2,6 +2,7 @@
 This module defines the Product class representing a product in the store,
 and its derived classes for non-stocked and limited products.
 """
+from inventory import SplitShipment
 
 
 class Product:
@@ -28,6 +29,7 @@ class Product:
         self._quantity = quantity
         self.active = True
         self._promotion = None
+        self._inventory = None
 
     def get_name(self):
         """
@@ -51,16 +53,86 @@ class Product:
         """
         Sets the quantity of the product. Deactivates product if quantity is less than 1.
 
+        If the product is stocked in several locations, a decrease is taken from
+        the locations with the most stock, split across as many as needed, and
+        an increase is added to the nearest location. Allocation strategies only
+        apply when the product is bought.
+
         Args:
             quantity (int): The new quantity of the product.
         """
-        if quantity >= 0:
+        if quantity >= 0 and self._inventory is not None:
+            if quantity < self._quantity:
+                self._inventory.remove(self._quantity - quantity, SplitShipment())
+            elif quantity > self._quantity:
+                self._inventory.add(quantity - self._quantity)
+            self._refresh_quantity()
+        elif quantity >= 0:
             self._quantity = quantity
             if quantity < 1:
                 self.deactivate()
             else:
                 self.activate()
 
+    def get_inventory(self):
+        """
+        Returns the per-location inventory of the product.
+
+        Returns:
+            Inventory or None: The inventory, or None if the product is stocked in a single place.
+        """
+        return self._inventory
+
+    def set_inventory(self, inventory):
+        """
+        Stocks the product in several locations. The quantity of the product
+        becomes the total across all locations.
+
+        Args:
+            inventory (Inventory): The per-location inventory.
+        """
+        self._inventory = inventory
+        self._refresh_quantity()
+
+    def set_location_quantity(self, location, quantity):
+        """
+        Sets the quantity of the product held in one location.
+
+        Args:
+            location (str): The location.
+            quantity (int): The new quantity held there.
+
+        Raises:
+            ValueError: If the product has no per-location inventory.
+        """
+        if self._inventory is None:
+            raise ValueError("Product is not stocked by location")
+        self._inventory.set_location_quantity(location, quantity)
+        self._refresh_quantity()
+
+    def _remove_stock(self, quantity, strategy=None, destination=None, allocation=None):
+        """
+        Removes a bought quantity from stock. Products stocked in several
+        locations take it from the locations chosen by the allocation strategy.
+        """
+        if self._inventory is None:
+            self.set_quantity(self.get_quantity() - quantity)
+            return
+        taken = self._inventory.remove(quantity, strategy, destination)
+        self._refresh_quantity()
+        if allocation is not None:
+            allocation.extend(taken)
+
+    def _refresh_quantity(self):
+        """
+        Caches the total quantity of the inventory and updates whether the product is active.
+        """
+        self._quantity = self._inventory.get_quantity()
+        if self._quantity < 1:
+            self.deactivate()
+        else:
+            self.activate()
+
     def get_price(self):
         """
         Returns the price of the product.
@@ -140,12 +212,17 @@ class Product:
         return f"{self.get_name()}, Price: £{self.get_price()}, " \
                f"Quantity: {self.get_quantity()}"
 
-    def buy(self, quantity):
+    def buy(self, quantity, strategy=None, destination=None, allocation=None):
         """
         Buys a specified quantity of the product.
 
         Args:
             quantity (int): The quantity to buy.
+            strategy: Optional allocation strategy for products stocked in several
+                locations, the inventory's strategy by default.
+            destination (str): Optional destination the order is shipped to.
+            allocation (list): Optional list that receives the (location, quantity)
+                tuples the stock was taken from.
 
         Returns:
             float: The total cost of the purchase.
@@ -162,13 +239,11 @@ class Product:
             raise ValueError("Invalid quantity. Please provide a positive value.")
 
         if not self.get_promotion():
-            remaining_quantity = self.get_quantity() - quantity
-            self.set_quantity(remaining_quantity)
+            self._remove_stock(quantity, strategy, destination, allocation)
             return float(quantity * self.get_price())
         else:
             discounted_price = self.get_promotion().apply_promotion(self, quantity)
-            remaining_quantity = self.get_quantity() - quantity
-            self.set_quantity(remaining_quantity)
+            self._remove_stock(quantity, strategy, destination, allocation)
             return float(discounted_price)
 
 
@@ -256,7 +331,7 @@ class LimitedProduct(Product):
     Inherits from the Product class.
     """
 
-    def __init__(self, name, price, quantity, maximum):
+    def __init__(self, name, price, quantity, maximum, customer_limit=None, window=86400):
         """
         Initialize a limited product with the given name,
         price, quantity, and maximum purchase limit.
@@ -266,14 +341,21 @@ class LimitedProduct(Product):
             price (float): The price of the product.
             quantity (int): The quantity of the product.
             maximum (int): The maximum purchase limit.
+            customer_limit (int): Optional number of units a customer may buy per window.
+            window (float): The length of the customer limit window in seconds.
 
         Raises:
-            ValueError: If the maximum limit is less than 1 or greater than the quantity.
+            ValueError: If the maximum limit is less than 1 or greater than the quantity,
+            or the customer limit or window is not positive.
         """
         super().__init__(name, price, quantity)
         if maximum < 1 or maximum > quantity:
             raise ValueError("Invalid maximum limit")
+        if (customer_limit is not None and customer_limit < 1) or window <= 0:
+            raise ValueError("Invalid customer limit")
         self._maximum = maximum
+        self._customer_limit = customer_limit
+        self._window = window
 
     def get_maximum(self):
         """
@@ -284,6 +366,24 @@ class LimitedProduct(Product):
         """
         return self._maximum
 
+    def get_customer_limit(self):
+        """
+        Return the number of units a customer may buy within the limit window.
+
+        Returns:
+            int or None: The per-customer limit, or None if customers are not limited.
+        """
+        return self._customer_limit
+
+    def get_window(self):
+        """
+        Return the length of the per-customer limit window.
+
+        Returns:
+            float: The window length in seconds.
+        """
+        return self._window
+
     def show(self):
         """
         Return a string representation of the limited product.
@@ -302,12 +402,17 @@ class LimitedProduct(Product):
             return f"{self.get_name()}, Price: £{self.get_price()}, " \
                    f"Quantity: {self.get_quantity()}, Maximum: {self.get_maximum()}"
 
-    def buy(self, quantity):
+    def buy(self, quantity, strategy=None, destination=None, allocation=None):
         """
         Buy a specified quantity of the limited product.
 
         Args:
             quantity (int): The quantity to buy.
+            strategy: Optional allocation strategy for products stocked in several
+                locations, the inventory's strategy by default.
+            destination (str): Optional destination the order is shipped to.
+            allocation (list): Optional list that receives the (location, quantity)
+                tuples the stock was taken from.
 
         Returns:
             float: The total cost of the purchase.
@@ -324,11 +429,9 @@ class LimitedProduct(Product):
             raise ValueError("Invalid quantity. Please provide a positive value.")
 
         if not self.get_promotion():
-            remaining_quantity = self.get_quantity() - quantity
-            self.set_quantity(remaining_quantity)
+            self._remove_stock(quantity, strategy, destination, allocation)
             return float(quantity * self.get_price())
         else:
             discounted_price = self.get_promotion().apply_promotion(self, quantity)
-            remaining_quantity = self.get_quantity() - quantity
-            self.set_quantity(remaining_quantity)
+            self._remove_stock(quantity, strategy, destination, allocation)
             return float(discounted_price)
@@ -0,0 +1,309 @@
+"""
+This module compiles promotions defined in a JSON or TOML config file into
+pricing closures.
+
+Every rule in the config is validated and turned into a closure of
+(price, quantity) once, when the config is loaded. Rule types:
+
+    percent_off:        {"percent": 30}
+    every_nth_free:     {"n": 3}
+    nth_at_percent:     {"n": 2, "percent": 50}
+    tiered:             {"tiers": [{"min_quantity": 10, "percent": 5}, ...]}
+
+Each rule also has an "id", a display "name" and an optional list of
+"products" it is applied to by name.
+"""
+
+import json
+import os
+from bisect import bisect_right
+
+from promotions import Promotions
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+def _percent_off(rule):
+    """
+    Compiles a rule taking a percentage off every item.
+    """
+    factor = 1 - _percent(rule) / 100
+
+    def price(unit_price, quantity):
+        return unit_price * factor * quantity
+    return price
+
+
+def _every_nth_free(rule):
+    """
+    Compiles a rule making every nth item free.
+    """
+    n = _positive_int(rule, "n")
+
+    def price(unit_price, quantity):
+        return (quantity - quantity // n) * unit_price
+    return price
+
+
+def _nth_at_percent(rule):
+    """
+    Compiles a rule taking a percentage off every nth item.
+    """
+    n = _positive_int(rule, "n")
+    factor = 1 - _percent(rule) / 100
+
+    def price(unit_price, quantity):
+        discounted_items = quantity // n
+        return (quantity - discounted_items) * unit_price \
+            + discounted_items * (unit_price * factor)
+    return price
+
+
+def _tiered(rule):
+    """
+    Compiles a rule taking a percentage off every item, where the percentage
+    depends on the highest quantity break the order reaches.
+    """
+    tiers = sorted((_positive_int(tier, "min_quantity"), 1 - _percent(tier) / 100)
+                   for tier in rule.get("tiers") or ())
+    if not tiers:
+        raise ValueError(f"Invalid tiers for promotion {rule.get('id')!r}")
+    breaks = tuple(min_quantity for min_quantity, _ in tiers)
+    factors = (1,) + tuple(factor for _, factor in tiers)
+
+    def price(unit_price, quantity):
+        return unit_price * factors[bisect_right(breaks, quantity)] * quantity
+    return price
+
+
+_COMPILERS = {
+    "percent_off": _percent_off,
+    "every_nth_free": _every_nth_free,
+    "nth_at_percent": _nth_at_percent,
+    "tiered": _tiered,
+}
+
+
+def _percent(rule):
+    """
+    Returns the validated percentage of a rule.
+    """
+    percent = rule.get("percent")
+    if isinstance(percent, bool) or not isinstance(percent, (int, float)) \
+            or not 0 <= percent <= 100:
+        raise ValueError(f"Invalid percent for promotion {rule.get('id')!r}")
+    return percent
+
+
+def _positive_int(rule, field):
+    """
+    Returns a validated positive integer field of a rule.
+    """
+    value = rule.get(field)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"Invalid {field} for promotion {rule.get('id')!r}")
+    return value
+
+
+def compile_rule(rule):
+    """
+    Compiles a promotion rule into a pricing closure.
+
+    Args:
+        rule (dict): The promotion rule.
+
+    Returns:
+        callable: A function of (unit_price, quantity) returning the total cost.
+
+    Raises:
+        ValueError: If the rule type is unknown or its parameters are invalid.
+    """
+    compiler = _COMPILERS.get(rule.get("type"))
+    if compiler is None:
+        raise ValueError(f"Unknown promotion type {rule.get('type')!r}")
+    return compiler(rule)
+
+
+def load_rules(path):
+    """
+    Reads the promotion rules from a JSON or TOML file.
+
+    Args:
+        path (str): The path of the config file.
+
+    Returns:
+        list: The promotion rules.
+
+    Raises:
+        ValueError: If the file cannot be parsed or TOML is not supported.
+    """
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML promotion configs require Python 3.11 or later")
+        with open(path, "rb") as file:
+            config = tomllib.load(file)
+    else:
+        with open(path, encoding="utf-8") as file:
+            config = json.load(file)
+    rules = config.get("promotions", [])
+    for rule in rules:
+        if not rule.get("id") or not rule.get("name"):
+            raise ValueError("Every promotion needs an id and a name")
+    return rules
+
+
+class CompiledPromotion(Promotions):
+    """
+    Represents a promotion whose pricing was compiled from a config rule.
+
+    Inherits from the Promotions class.
+    """
+
+    def __init__(self, name, pricer):
+        """
+        Initializes a new CompiledPromotion instance.
+
+        Args:
+            name (str): The name of the promotion.
+            pricer (callable): A function of (unit_price, quantity) returning the total cost.
+        """
+        super().__init__(name)
+        self._pricer = pricer
+
+    def set_pricer(self, pricer):
+        """
+        Replaces the pricing closure of the promotion.
+
+        Args:
+            pricer (callable): A function of (unit_price, quantity) returning the total cost.
+        """
+        self._pricer = pricer
+
+    def apply_promotion(self, product, quantity) -> float:
+        """
+        Applies the compiled promotion to the product for the specified quantity.
+
+        Args:
+            product (Product): The product to apply the promotion to.
+            quantity (int): The quantity of the product.
+
+        Returns:
+            float: The total cost of the product after applying the promotion.
+        """
+        return self._pricer(product.get_price(), quantity)
+
+
+class PromotionCatalog:
+    """
+    Holds the promotions compiled from a config file and reloads them when it changes.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes a new PromotionCatalog instance and loads the config file.
+
+        Args:
+            path (str): The path of the JSON or TOML config file.
+        """
+        self._path = path
+        self._promotions = {}
+        self._product_names = {}
+        self._products = {}
+        self._mtime = None
+        self.reload()
+
+    def get(self, promotion_id):
+        """
+        Returns the promotion with the given id.
+
+        Args:
+            promotion_id (str): The id of the promotion.
+
+        Returns:
+            CompiledPromotion or None: The promotion, or None if it is not defined.
+        """
+        return self._promotions.get(promotion_id)
+
+    def apply(self, products):
+        """
+        Sets the promotion of every product named by a rule in the config.
+
+        The catalog keeps track of the products and updates them again on
+        every reload.
+
+        Args:
+            products (list): The products to update.
+        """
+        for product in products:
+            self._products[id(product)] = product
+            self._assign(product)
+
+    def _assign(self, product):
+        """
+        Sets the promotion of a product from the current rules, removing a
+        catalog promotion the rules no longer give it.
+        """
+        promotion_id = self._product_names.get(product.get_name())
+        if promotion_id is not None:
+            product.set_promotion(self._promotions[promotion_id])
+        elif isinstance(product.get_promotion(), CompiledPromotion):
+            product.set_promotion(None)
+
+    def reload(self):
+        """
+        Loads and compiles the config file.
+
+        Promotions that keep their id update their pricing in place, and the
+        products passed to apply() are given the promotions of the new rules.
+        If the config is invalid or cannot be read, the current promotions are
+        left untouched.
+
+        Raises:
+            ValueError: If the config file is invalid or cannot be read.
+        """
+        try:
+            mtime = os.path.getmtime(self._path)
+            rules = load_rules(self._path)
+        except OSError as error:
+            raise ValueError(f"Cannot read promotions: {error}") from error
+        compiled = [(rule, compile_rule(rule)) for rule in rules]
+
+        promotions = {}
+        product_names = {}
+        for rule, pricer in compiled:
+            promotion = self._promotions.get(rule["id"])
+            if promotion is None:
+                promotion = CompiledPromotion(rule["name"], pricer)
+            else:
+                promotion.set_name(rule["name"])
+                promotion.set_pricer(pricer)
+            promotions[rule["id"]] = promotion
+            for product_name in rule.get("products", []):
+                product_names[product_name] = rule["id"]
+        self._promotions = promotions
+        self._product_names = product_names
+        self._mtime = mtime
+        for product in self._products.values():
+            self._assign(product)
+
+    def reload_if_changed(self):
+        """
+        Reloads the config file if it was modified since it was last loaded.
+
+        Returns:
+            bool: True if the config was reloaded, False otherwise.
+
+        Raises:
+            ValueError: If the config file is invalid or cannot be read.
+        """
+        try:
+            mtime = os.path.getmtime(self._path)
+        except OSError as error:
+            raise ValueError(f"Cannot read promotions: {error}") from error
+        if mtime == self._mtime:
+            return False
+        self.reload()
+        return True
@@ -73,8 +73,8 @@ class SecondHalfPrice(Promotions):
         """
         if quantity < 2:
             return product.get_price() * quantity
-        full_price_items = quantity // 2
-        half_price_items = quantity - full_price_items
+        half_price_items = quantity // 2
+        full_price_items = quantity - half_price_items
         total_cost = (full_price_items * product.get_price()) + (half_price_items * (product.get_price() / 2))
         return total_cost
 
@@ -100,9 +100,9 @@ class ThirdOneFree(Promotions):
         if quantity < 3:
             return product.get_price() * quantity
         else:
-            full_price_items = quantity // 3
-            free_items = full_price_items
-            total_cost = full_price_items * 2 * product.get_price()
+            free_items = quantity // 3
+            full_price_items = quantity - free_items
+            total_cost = full_price_items * product.get_price()
             return total_cost
 
 
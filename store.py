@@ -6,7 +6,7 @@ Class:
         Represents a store and provides methods for managing products and placing orders.
 
 Methods:
-    __init__(self, product):
+    __init__(self, product, idempotency_cache=None, purchase_limiter=None, history=None):
         Initializes the Store object with a list of products.
 
     add_product(self, product):
@@ -15,17 +15,19 @@ Methods:
     remove_product(self, product):
         Removes a product from the store.
 
-    get_total_quantity(self):
-        Retrieves the total quantity of all products in the store.
+    get_total_quantity(self, location=None):
+        Retrieves the total quantity of all products in the store, optionally in one location.
 
     get_all_products(self):
         Retrieves a list of all active products in the store.
 
-    order(self, shopping_list):
+    order(self, shopping_list, idempotency_key=None, customer_id=None):
         Places an order for a list of products and calculates the total cost of the order.
 
         Args:
             shopping_list (list): A list of tuples containing a product and its desired quantity.
+            idempotency_key (str): Optional key identifying retries of the same order.
+            customer_id (str): Optional identifier of the customer placing the order.
 
         Returns:
             float: The total cost of the order.
@@ -41,14 +43,23 @@ class Store:
     Represents a store and provides methods for managing products and placing orders.
     """
 
-    def __init__(self, product):
+    def __init__(self, product, idempotency_cache=None, purchase_limiter=None, history=None):
         """
         Initializes the Store object with a list of products.
 
         Args:
             product (list): A list of products to add to the store.
+            idempotency_cache (IdempotencyCache): Optional cache used to deduplicate
+                orders placed with an idempotency key.
+            purchase_limiter (PurchaseLimiter): Optional limiter enforcing per-customer
+                limits on limited products.
+            history (OrderHistory): Optional history the lines of every completed
+                order are recorded in.
         """
         self.products = list(product)
+        self._idempotency_cache = idempotency_cache
+        self._purchase_limiter = purchase_limiter
+        self._history = history
 
     def add_product(self, product):
         """
@@ -69,16 +80,23 @@ class Store:
         if product in self.products:
             self.products.remove(product)
 
-    def get_total_quantity(self):
+    def get_total_quantity(self, location=None):
         """
         Retrieves the total quantity of all products in the store.
 
+        Args:
+            location (str): Optional location to count stock in. Products that
+                are not stocked by location are only counted without a location.
+
         Returns:
             int: The total quantity of products.
         """
         total_quantity = 0
         for product in self.products:
-            total_quantity += product.get_quantity()
+            if location is None:
+                total_quantity += product.get_quantity()
+            elif product.get_inventory() is not None:
+                total_quantity += product.get_inventory().get_location_quantity(location)
         return total_quantity
 
     def get_all_products(self):
@@ -94,12 +112,30 @@ class Store:
                 active_products.append(product)
         return active_products
 
-    def order(self, shopping_list):
+    def order(self, shopping_list, idempotency_key=None, customer_id=None, destination=None,
+              allocation_strategy=None, allocations=None):
         """
         Places an order for a list of products and calculates the total cost of the order.
 
+        When an idempotency key is given and the store has an idempotency cache,
+        repeated orders with the same key return the cost of the first order
+        without buying the products again. Reusing a key for a different
+        shopping list, customer or destination raises a ValueError. When a customer identifier is given
+        and the store has a purchase limiter, the order is rejected if it would
+        take the customer over a product's per-customer limit. Products stocked
+        in several locations are taken from the locations chosen by the
+        allocation strategy for the destination.
+
         Args:
             shopping_list (list): A list of tuples containing a product and its desired quantity.
+            idempotency_key (str): Optional key identifying retries of the same order.
+            customer_id (str): Optional identifier of the customer placing the order.
+            destination (str): Optional destination the order is shipped to.
+            allocation_strategy: Optional strategy overriding the products' own
+                allocation strategies for this order.
+            allocations (list): Optional list that receives a (product, [(location, quantity)])
+                tuple for every line taken from a per-location inventory. It is
+                left empty when a cached order is returned for an idempotency key.
 
         Returns:
             float: The total cost of the order.
@@ -107,21 +143,107 @@ class Store:
         Raises:
             ValueError: If an invalid order is encountered, such as a product being out of stock or insufficient quantity.
         """
+        if idempotency_key is not None and self._idempotency_cache is not None:
+            fingerprint = {
+                "lines": [[product.get_name(), quantity] for product, quantity in shopping_list],
+                "customer_id": customer_id,
+                "destination": destination,
+            }
+            return self._idempotency_cache.get_or_compute(
+                idempotency_key, lambda: self._place_order(
+                    shopping_list, customer_id, destination, allocation_strategy, allocations),
+                fingerprint)
+        return self._place_order(shopping_list, customer_id, destination, allocation_strategy,
+                                 allocations)
+
+    def _place_order(self, shopping_list, customer_id=None, destination=None,
+                     allocation_strategy=None, allocations=None):
+        """
+        Buys every product in the shopping list and returns the total cost.
+
+        Args:
+            shopping_list (list): A list of tuples containing a product and its desired quantity.
+            customer_id (str): Optional identifier of the customer placing the order.
+            destination (str): Optional destination the order is shipped to.
+            allocation_strategy: Optional strategy overriding the products' own strategies.
+            allocations (list): Optional list that receives the allocation of every line.
+
+        Returns:
+            float: The total cost of the order.
+        """
+        reservation = None
+        if customer_id is not None and self._purchase_limiter is not None:
+            reservation = self._purchase_limiter.reserve(customer_id, shopping_list)
+        try:
+            return self._buy_all(shopping_list, destination, allocation_strategy, allocations)
+        except ValueError:
+            if reservation:
+                self._purchase_limiter.release(reservation)
+            raise
+
+    def _buy_all(self, shopping_list, destination=None, allocation_strategy=None,
+                 allocations=None):
+        """
+        Buys every product in the shopping list and returns the total cost.
+
+        Args:
+            shopping_list (list): A list of tuples containing a product and its desired quantity.
+            destination (str): Optional destination the order is shipped to.
+            allocation_strategy: Optional strategy overriding the products' own strategies.
+            allocations (list): Optional list that receives the allocation of every line.
+
+        Returns:
+            float: The total cost of the order.
+        """
         total_cost = 0
+        bought_lines = []
         for product, quantity in shopping_list:
-            if product in self.products and product.is_active() and product.get_quantity() >= quantity:
-                cost = product.buy(quantity)
-                total_cost += cost
-            elif isinstance(product, products.LimitedProduct):
-                if product.get_maximum() > quantity:
-                    raise ValueError(f"You can only get {product.get_maximum()} of this item")
-                else:
-                    cost = product.buy(quantity)
-                    total_cost += cost
-            elif isinstance(product, products.NonStockedProduct):
-                if quantity > product.get_quantity():
-                    cost = product.buy(quantity)
-                    total_cost += cost
+            full_price = product.get_price() * quantity
+            promotion = product.get_promotion()
+            if product.get_inventory() is None:
+                cost = self._buy_line(product, quantity)
             else:
-                raise ValueError("Invalid order. Product is out of stock or insufficient quantity.")
+                allocation = []
+                cost = self._buy_line(product, quantity, strategy=allocation_strategy,
+                                      destination=destination, allocation=allocation)
+                if allocations is not None:
+                    allocations.append((product, allocation))
+            if cost is None:
+                continue
+            total_cost += cost
+            bought_lines.append((product.get_name(), quantity, cost, full_price - cost,
+                                 promotion.get_name() if promotion else None))
+        if self._history is not None:
+            for line in bought_lines:
+                self._history.record(*line)
         return total_cost
+
+    def _buy_line(self, product, quantity, **buy_options):
+        """
+        Buys one line of an order.
+
+        Args:
+            product (Product): The product to buy.
+            quantity (int): The desired quantity.
+            buy_options: The allocation options passed on to the product's buy method.
+
+        Returns:
+            float or None: The cost of the line, or None if nothing was bought.
+
+        Raises:
+            ValueError: If the product is out of stock or the quantity is invalid.
+        """
+        cost = None
+        if product in self.products and product.is_active() and product.get_quantity() >= quantity:
+            cost = product.buy(quantity, **buy_options)
+        elif isinstance(product, products.LimitedProduct):
+            if product.get_maximum() > quantity:
+                raise ValueError(f"You can only get {product.get_maximum()} of this item")
+            else:
+                cost = product.buy(quantity, **buy_options)
+        elif isinstance(product, products.NonStockedProduct):
+            if quantity > product.get_quantity():
+                cost = product.buy(quantity, **buy_options)
+        else:
+            raise ValueError("Invalid order. Product is out of stock or insufficient quantity.")
+        return cost
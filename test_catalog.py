@@ -0,0 +1,84 @@
+import multiprocessing
+
+import pytest
+from catalog import MappedCatalog, write_catalog
+from products import Product, NonStockedProduct, LimitedProduct
+from promotions import ThirdOneFree
+from store import Store
+
+
+def read_quantity(path, name):
+    with MappedCatalog(path) as catalog:
+        return catalog.get(name).get_quantity()
+
+
+def test_catalog_round_trip(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    earbuds = Product("Bose QuietComfort Earbuds", price=250, quantity=500)
+    earbuds.set_promotion(ThirdOneFree("Third One Free!"))
+    product_list = [Product("MacBook Air M2", price=1450, quantity=100),
+                    earbuds,
+                    NonStockedProduct("Windows License", price=125),
+                    LimitedProduct("Shipping", price=10, quantity=250, maximum=1)]
+    write_catalog(product_list, path)
+    with MappedCatalog(path) as catalog:
+        assert len(catalog) == 4
+        views = list(catalog)
+        for product, view in zip(product_list, views):
+            assert view.get_name() == product.get_name()
+            assert view.get_price() == product.get_price()
+            assert view.get_quantity() == product.get_quantity()
+            assert view.is_active() == product.is_active()
+            assert view.show() == product.show()
+        assert views[1].get_promotion_name() == "Third One Free!"
+        assert views[3].get_maximum() == 1
+        assert views[0].get_maximum() is None
+        assert views[2].show() == "Windows License, Price: £125"
+
+
+def test_float_prices_keep_their_type(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    write_catalog([Product("Cable", price=9.99, quantity=3), Product("Case", price=20, quantity=1)],
+                  path)
+    with MappedCatalog(path) as catalog:
+        assert catalog.get("Cable").show() == "Cable, Price: £9.99, Quantity: 3"
+        assert isinstance(catalog.get("Case").get_price(), int)
+
+
+def test_lookup_by_name(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    names = ["MacBook Air M2", "Bose QuietComfort Earbuds", "Windows License", "Shipping"]
+    write_catalog([Product(name, price=10, quantity=1) for name in names], path)
+    with MappedCatalog(path) as catalog:
+        for name in names:
+            assert catalog.get(name).get_name() == name
+        assert catalog.get("Nokia 3310") is None
+
+
+def test_views_are_read_only(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    write_catalog([LimitedProduct("Shipping", price=10, quantity=250, maximum=1)], path)
+    with MappedCatalog(path) as catalog:
+        with pytest.raises(ValueError):
+            catalog.get("Shipping").buy(1)
+
+
+def test_store_rejects_orders_for_views(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    write_catalog([Product("MacBook Air M2", price=1450, quantity=100)], path)
+    with MappedCatalog(path) as catalog:
+        view = catalog.get("MacBook Air M2")
+        best_buy = Store([view])
+        with pytest.raises(ValueError):
+            best_buy.order([(view, 1)])
+        assert best_buy.get_total_quantity() == 100
+        assert best_buy.get_total_quantity("London") == 0
+
+
+def test_catalog_is_shared_with_worker_processes(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    write_catalog([Product("MacBook Air M2", price=1450, quantity=100),
+                   LimitedProduct("Shipping", price=10, quantity=250, maximum=1)], path)
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        quantities = pool.starmap(read_quantity, [(path, "MacBook Air M2"), (path, "Shipping")])
+    assert quantities == [100, 250]
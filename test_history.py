@@ -0,0 +1,101 @@
+import pytest
+from history import OrderHistory
+from products import Product
+from promotions import ThirdOneFree
+from store import Store
+
+
+def test_store_records_order_lines(clock):
+    history = OrderHistory(clock=clock)
+    earbuds = Product("Bose QuietComfort Earbuds", price=250, quantity=500)
+    earbuds.set_promotion(ThirdOneFree("Third One Free!"))
+    macbook = Product("MacBook Air M2", price=1450, quantity=100)
+    best_buy = Store([earbuds, macbook], history=history)
+    best_buy.order([(earbuds, 3), (macbook, 1)])
+    assert len(history) == 2
+    assert list(history.iter_lines()) == [
+        (36000.0, "Bose QuietComfort Earbuds", 3, 500.0, 250.0, "Third One Free!"),
+        (36000.0, "MacBook Air M2", 1, 1450.0, 0.0, None)]
+    sales = history.get_sales("Bose QuietComfort Earbuds")
+    assert sales == {"units": 3, "revenue": 500.0, "discounts": {"Third One Free!": 250.0}}
+
+
+def test_top_sellers_in_recent_buckets(clock):
+    history = OrderHistory(bucket_seconds=60, clock=clock)
+    earbuds = Product("Bose QuietComfort Earbuds", price=250, quantity=500)
+    earbuds.set_promotion(ThirdOneFree("Third One Free!"))
+    macbook = Product("MacBook Air M2", price=1450, quantity=100)
+    best_buy = Store([earbuds, macbook], history=history)
+    best_buy.order([(earbuds, 10)])
+    clock.now += 7200
+    best_buy.order([(macbook, 2), (earbuds, 1)])
+    assert history.top_sellers(seconds=3600) == [
+        ("MacBook Air M2", 2), ("Bose QuietComfort Earbuds", 1)]
+    assert history.top_sellers(seconds=86400, limit=1) == [("Bose QuietComfort Earbuds", 11)]
+    assert history.top_sellers(seconds=3600, by="revenue")[0] == ("MacBook Air M2", 2900.0)
+
+
+def test_lines_spill_to_disk(tmp_path, clock):
+    history = OrderHistory(spill_path=str(tmp_path / "history.bin"), spill_threshold=2,
+                           clock=clock)
+    for quantity in range(1, 6):
+        history.record("Example Product", quantity, 10.0 * quantity)
+    assert len(history) == 5
+    assert [line[2] for line in history.iter_lines()] == [1, 2, 3, 4, 5]
+    assert history.get_sales("Example Product")["units"] == 15
+
+
+def test_failed_order_is_not_recorded(clock):
+    history = OrderHistory(clock=clock)
+    earbuds = Product("Bose QuietComfort Earbuds", price=250, quantity=500)
+    earbuds.set_promotion(ThirdOneFree("Third One Free!"))
+    macbook = Product("MacBook Air M2", price=1450, quantity=100)
+    best_buy = Store([earbuds, macbook], history=history)
+    with pytest.raises(ValueError):
+        best_buy.order([(earbuds, 3), (macbook, 1000)])
+    assert len(history) == 0
+    assert history.top_sellers() == []
+
+
+def test_queries_are_bucket_aligned(clock):
+    history = OrderHistory(bucket_seconds=300, clock=clock)
+    history.record("Example Product", 1, 10.0)
+    clock.now += 3600
+    history.record("Example Product", 2, 20.0)
+    assert history.get_sales("Example Product", seconds=3600)["units"] == 2
+    assert history.get_sales("Example Product", seconds=3900)["units"] == 3
+
+
+def test_old_buckets_are_pruned(clock):
+    history = OrderHistory(bucket_seconds=60, retention_buckets=10, clock=clock)
+    for _ in range(100):
+        history.record("Example Product", 1, 10.0)
+        clock.now += 60
+    assert len(history._rollups) == 10
+    assert history.get_sales("Example Product", seconds=86400)["units"] == 10
+    assert len(history) == 100
+
+
+def test_pruning_survives_clock_stepping_back(clock):
+    history = OrderHistory(bucket_seconds=60, retention_buckets=2, clock=clock)
+    history.record("Example Product", 1, 10.0)
+    clock.now -= 120
+    history.record("Example Product", 2, 20.0)
+    clock.now += 180
+    history.record("Example Product", 4, 40.0)
+    assert len(history._rollups) == 2
+    assert history.get_sales("Example Product", seconds=86400)["units"] == 5
+
+
+def test_concurrent_records_are_all_kept(tmp_path, run_concurrently):
+    history = OrderHistory(spill_path=str(tmp_path / "history.bin"), spill_threshold=50)
+
+    def record_lines():
+        for number in range(500):
+            history.record(f"Product {number % 20}", 1, 10.0)
+
+    run_concurrently(record_lines, 8)
+    assert len(history) == 4000
+    assert sum(1 for _ in history.iter_lines()) == 4000
+    assert sum(history.get_sales(f"Product {number}")["units"] for number in range(20)) == 4000
+    assert len(history.top_sellers(limit=100)) == 20
@@ -0,0 +1,105 @@
+import pytest
+from idempotency import IdempotencyCache
+from products import Product
+from store import Store
+
+
+def test_repeated_order_is_not_bought_twice():
+    product = Product("Example Product", 50.0, 100)
+    best_buy = Store([product], idempotency_cache=IdempotencyCache())
+    assert best_buy.order([(product, 2)], idempotency_key="order-1") == 100.0
+    assert best_buy.order([(product, 2)], idempotency_key="order-1") == 100.0
+    assert product.get_quantity() == 98
+
+
+def test_order_without_key_is_not_deduplicated():
+    product = Product("Example Product", 50.0, 100)
+    best_buy = Store([product], idempotency_cache=IdempotencyCache())
+    best_buy.order([(product, 2)])
+    best_buy.order([(product, 2)])
+    assert product.get_quantity() == 96
+
+
+def test_failed_order_is_not_cached():
+    product = Product("Example Product", 50.0, 1)
+    best_buy = Store([product], idempotency_cache=IdempotencyCache())
+    with pytest.raises(ValueError):
+        best_buy.order([(product, 5)], idempotency_key="order-1")
+    product.set_quantity(10)
+    assert best_buy.order([(product, 5)], idempotency_key="order-1") == 250.0
+
+
+def test_reused_key_for_different_order_raises():
+    product = Product("Example Product", 50.0, 100)
+    best_buy = Store([product], idempotency_cache=IdempotencyCache())
+    best_buy.order([(product, 2)], idempotency_key="order-1")
+    with pytest.raises(ValueError):
+        best_buy.order([(product, 100)], idempotency_key="order-1")
+    assert product.get_quantity() == 98
+
+
+def test_reused_key_for_different_customer_or_destination_raises():
+    product = Product("Example Product", 50.0, 100)
+    best_buy = Store([product], idempotency_cache=IdempotencyCache())
+    best_buy.order([(product, 2)], idempotency_key="order-1", customer_id="alice")
+    with pytest.raises(ValueError):
+        best_buy.order([(product, 2)], idempotency_key="order-1", customer_id="bob")
+    with pytest.raises(ValueError):
+        best_buy.order([(product, 2)], idempotency_key="order-1", customer_id="alice",
+                       destination="Home")
+    assert product.get_quantity() == 98
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = IdempotencyCache(ttl=60, clock=clock)
+    cache.put("order-1", 10.0)
+    clock.now += 59
+    assert cache.get("order-1") == 10.0
+    clock.now += 1
+    assert cache.get("order-1") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = IdempotencyCache(max_size=2)
+    cache.put("order-1", 1.0)
+    cache.put("order-2", 2.0)
+    cache.get("order-1")
+    cache.put("order-3", 3.0)
+    assert len(cache) == 2
+    assert cache.get("order-2") is None
+    assert cache.get("order-1") == 1.0
+
+
+def test_entries_survive_restart(tmp_path, clock):
+    path = str(tmp_path / "orders.jsonl")
+    cache = IdempotencyCache(ttl=60, path=path, clock=clock)
+    cache.put("order-1", 10.0)
+    cache.put("order-2", 20.0)
+    clock.now += 30
+    cache.put("order-3", 30.0)
+    clock.now += 40
+    restarted = IdempotencyCache(ttl=60, path=path, clock=clock)
+    assert restarted.get("order-1") is None
+    assert restarted.get("order-3") == 30.0
+    assert len(restarted) == 1
+
+
+def test_persistence_file_is_compacted_while_running(tmp_path):
+    path = tmp_path / "orders.jsonl"
+    cache = IdempotencyCache(max_size=3, path=str(path))
+    for number in range(20):
+        cache.put(f"order-{number}", float(number))
+    assert len(path.read_text().splitlines()) <= 6
+    restarted = IdempotencyCache(max_size=3, path=str(path))
+    assert restarted.get("order-19") == 19.0
+    assert restarted.get("order-10") is None
+
+
+def test_concurrent_duplicate_submissions_buy_once(slow_buy, run_concurrently):
+    product = Product("Example Product", 50.0, 100)
+    best_buy = Store([product], idempotency_cache=IdempotencyCache())
+    slow_buy(product)
+    results = run_concurrently(
+        lambda: best_buy.order([(product, 3)], idempotency_key="order-1"), 8)
+    assert results == [150.0] * 8
+    assert product.get_quantity() == 97
@@ -0,0 +1,128 @@
+import pytest
+from inventory import Inventory, NearestLocation, MostStock, SplitShipment
+from products import Product
+from store import Store
+
+STOCK = {"London": 5, "Leeds": 20, "Glasgow": 10}
+DISTANCES = {"London": 1, "Leeds": 2, "Glasgow": 3}
+
+
+def buy(product, quantity):
+    allocation = []
+    product.buy(quantity, allocation=allocation)
+    return allocation
+
+
+def test_quantity_is_total_across_locations():
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory(STOCK, DISTANCES, NearestLocation()))
+    assert product.get_quantity() == 35
+    assert product.is_active()
+    product.set_location_quantity("London", 0)
+    assert product.get_quantity() == 30
+
+
+def test_nearest_location_splits_from_nearest():
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory(STOCK, DISTANCES, NearestLocation()))
+    assert buy(product, 8) == [("London", 5), ("Leeds", 3)]
+    assert product.get_quantity() == 27
+
+
+def test_most_stock_ships_from_one_location():
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory(STOCK, DISTANCES, MostStock()))
+    assert buy(product, 15) == [("Leeds", 15)]
+    with pytest.raises(ValueError):
+        product.buy(11)
+    assert product.get_quantity() == 20
+
+
+def test_set_quantity_splits_across_locations_with_any_strategy():
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory({"A": 5, "B": 5}, strategy=MostStock()))
+    product.set_quantity(2)
+    assert product.get_quantity() == 2
+    assert sum(product.get_inventory().get_location_quantities().values()) == 2
+
+
+def test_split_shipment_takes_largest_first():
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory(STOCK, DISTANCES, SplitShipment()))
+    assert buy(product, 25) == [("Leeds", 20), ("Glasgow", 5)]
+    assert buy(product, 6) == [("Glasgow", 5), ("London", 1)]
+
+
+def test_buying_all_stock_deactivates_product():
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory(STOCK, DISTANCES, NearestLocation()))
+    product.buy(35)
+    assert not product.is_active()
+    assert product.get_inventory().get_location_quantities() == {
+        "London": 0, "Leeds": 0, "Glasgow": 0}
+
+
+def test_store_total_quantity_by_location():
+    stocked = Product("Example Product", 50.0, 0)
+    stocked.set_inventory(Inventory(STOCK, DISTANCES, NearestLocation()))
+    best_buy = Store([stocked, Product("Other Product", 10.0, 7)])
+    best_buy.order([(stocked, 6)])
+    assert best_buy.get_total_quantity() == 36
+    assert best_buy.get_total_quantity("London") == 0
+    assert best_buy.get_total_quantity("Leeds") == 19
+
+
+def test_store_order_allocates_for_destination():
+    routes = {"Edinburgh": {"Glasgow": 1, "Leeds": 3, "London": 6},
+              "Brighton": {"London": 1, "Leeds": 4, "Glasgow": 7}}
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory(STOCK, DISTANCES, NearestLocation()))
+    best_buy = Store([product])
+    allocations = []
+    best_buy.order([(product, 12)], destination="Edinburgh",
+                   allocation_strategy=NearestLocation(routes), allocations=allocations)
+    assert allocations == [(product, [("Glasgow", 10), ("Leeds", 2)])]
+    allocations = []
+    best_buy.order([(product, 6)], destination="Brighton",
+                   allocation_strategy=NearestLocation(routes), allocations=allocations)
+    assert allocations == [(product, [("London", 5), ("Leeds", 1)])]
+    allocations = []
+    best_buy.order([(product, 1)], destination="Paris",
+                   allocation_strategy=NearestLocation(routes), allocations=allocations)
+    assert allocations == [(product, [("Leeds", 1)])]
+    assert product.get_quantity() == 16
+
+
+def test_destination_without_routes_uses_default_distances():
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory(STOCK, DISTANCES))
+    allocations = []
+    Store([product]).order([(product, 7)], destination="Home", allocations=allocations)
+    assert allocations == [(product, [("London", 5), ("Leeds", 2)])]
+
+
+def test_restock_goes_to_nearest_location():
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory(STOCK, DISTANCES, NearestLocation()))
+    product.set_quantity(40)
+    assert product.get_inventory().get_location_quantity("London") == 10
+
+
+def test_concurrent_orders_keep_their_own_destination(slow_buy, run_concurrently):
+    routes = {"Edinburgh": {"Glasgow": 1, "Leeds": 3, "London": 6},
+              "Brighton": {"London": 1, "Leeds": 4, "Glasgow": 7}}
+    product = Product("Example Product", 50.0, 0)
+    product.set_inventory(Inventory(STOCK, DISTANCES, NearestLocation(routes)))
+    best_buy = Store([product])
+    slow_buy(product)
+    destinations = ["Edinburgh", "Brighton"]
+
+    def place_order():
+        destination = destinations.pop()
+        allocations = []
+        best_buy.order([(product, 2)], destination=destination, allocations=allocations)
+        return destination, allocations[0][1]
+
+    results = run_concurrently(place_order, 2)
+    assert sorted(results) == [("Brighton", [("London", 2)]), ("Edinburgh", [("Glasgow", 2)])]
+    assert product.get_quantity() == 31
@@ -0,0 +1,75 @@
+import pytest
+from limits import PurchaseLimiter
+from products import Product, LimitedProduct
+from store import Store
+
+
+def test_customer_limit_spans_orders(clock):
+    shipping = LimitedProduct("Shipping", 10, 250, maximum=1, customer_limit=1)
+    best_buy = Store([shipping], purchase_limiter=PurchaseLimiter(clock=clock))
+    assert best_buy.order([(shipping, 1)], customer_id="alice") == 10.0
+    with pytest.raises(ValueError):
+        best_buy.order([(shipping, 1)], customer_id="alice")
+    assert best_buy.order([(shipping, 1)], customer_id="bob") == 10.0
+    assert shipping.get_quantity() == 248
+
+
+def test_customer_limit_resets_after_window(clock):
+    shipping = LimitedProduct("Shipping", 10, 250, maximum=1, customer_limit=1, window=86400)
+    best_buy = Store([shipping], purchase_limiter=PurchaseLimiter(clock=clock))
+    best_buy.order([(shipping, 1)], customer_id="alice")
+    clock.now += 86400 - 3600
+    with pytest.raises(ValueError):
+        best_buy.order([(shipping, 1)], customer_id="alice")
+    clock.now += 3600
+    assert best_buy.order([(shipping, 1)], customer_id="alice") == 10.0
+
+
+def test_order_without_customer_is_not_limited():
+    shipping = LimitedProduct("Shipping", 10, 250, maximum=1, customer_limit=1)
+    best_buy = Store([shipping], purchase_limiter=PurchaseLimiter())
+    best_buy.order([(shipping, 1)])
+    best_buy.order([(shipping, 1)])
+    assert shipping.get_quantity() == 248
+
+
+def test_limiter_ignores_unlimited_products():
+    product = Product("Example Product", 50.0, 100)
+    limiter = PurchaseLimiter()
+    Store([product], purchase_limiter=limiter).order([(product, 5)], customer_id="alice")
+    assert len(limiter) == 0
+
+
+def test_expired_purchases_are_dropped_per_window(clock):
+    shipping = LimitedProduct("Shipping", 10, 250, maximum=1, customer_limit=1, window=86400)
+    flash_sale = LimitedProduct("Flash Sale", 5, 250, maximum=1, customer_limit=1, window=3600)
+    limiter = PurchaseLimiter(clock=clock)
+    limiter.reserve("alice", [(shipping, 1)])
+    for number in range(1000):
+        limiter.reserve(f"customer-{number}", [(flash_sale, 1)])
+    assert len(limiter) == 1001
+
+    clock.now += 3600
+    assert len(limiter) == 1
+    assert limiter.get_purchased("customer-1", flash_sale) == 0
+    assert limiter.get_purchased("alice", shipping) == 1
+
+
+def test_failed_order_releases_reservation():
+    shipping = LimitedProduct("Shipping", 10, 250, maximum=1, customer_limit=1)
+    limiter = PurchaseLimiter()
+    best_buy = Store([shipping], purchase_limiter=limiter)
+    shipping.deactivate()
+    with pytest.raises(ValueError):
+        best_buy.order([(shipping, 1)], customer_id="alice")
+    assert limiter.get_purchased("alice", shipping) == 0
+
+
+def test_concurrent_orders_from_one_customer_respect_limit(slow_buy, run_concurrently):
+    shipping = LimitedProduct("Shipping", 10, 250, maximum=1, customer_limit=1)
+    best_buy = Store([shipping], purchase_limiter=PurchaseLimiter())
+    slow_buy(shipping)
+    results = run_concurrently(
+        lambda: best_buy.order([(shipping, 1)], customer_id="alice"), 5)
+    assert results.count(10.0) == 1
+    assert shipping.get_quantity() == 249
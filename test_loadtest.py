@@ -0,0 +1,48 @@
+import os
+
+import loadtest
+import pytest
+from loadtest import build_store, generate_orders, parse_mix, run
+
+
+PRODUCT_MIX = {"stocked": 2, "non_stocked": 1, "limited": 1}
+PROMOTION_MIX = {"none": 1, "second_half_price": 1, "third_one_free": 1}
+
+
+def test_parse_mix():
+    assert parse_mix("stocked=3,limited", ["stocked", "limited"]) == {"stocked": 3, "limited": 1}
+    with pytest.raises(ValueError):
+        parse_mix("gadgets=2", ["stocked"])
+
+
+def test_run_reports_latencies():
+    store = build_store(PRODUCT_MIX, PROMOTION_MIX)
+    orders = generate_orders(store, 200)
+    summary = run(store, orders, concurrency=2)
+    assert summary["orders"] == 200
+    assert summary["latency_ms"]["p50"] <= summary["latency_ms"]["p99"]
+
+
+def test_cprofile_run_writes_hotspots(tmp_path):
+    store = build_store(PRODUCT_MIX, PROMOTION_MIX)
+    orders = generate_orders(store, 200)
+    run(store, orders, concurrency=2, profiler="cprofile", output_dir=str(tmp_path))
+    assert os.path.exists(tmp_path / "profile.prof")
+    assert "store.py" in (tmp_path / "hotspots.txt").read_text()
+
+
+def test_cprofile_run_with_one_profiler_for_all_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(loadtest, "CPROFILE_SEES_ALL_THREADS", True)
+    store = build_store(PRODUCT_MIX, PROMOTION_MIX)
+    orders = generate_orders(store, 200)
+    summary = run(store, orders, concurrency=2, profiler="cprofile", output_dir=str(tmp_path))
+    assert summary["orders"] == 200
+    assert os.path.exists(tmp_path / "profile.prof")
+
+
+def test_sampling_run_writes_folded_stacks(tmp_path):
+    store = build_store(PRODUCT_MIX, PROMOTION_MIX)
+    orders = generate_orders(store, 20000)
+    run(store, orders, profiler="sampling", output_dir=str(tmp_path))
+    assert "order (store.py" in (tmp_path / "stacks.folded").read_text()
+    assert os.path.exists(tmp_path / "summary.json")
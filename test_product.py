@@ -1,5 +1,6 @@
 import pytest
 from products import Product
+from promotions import SecondHalfPrice, ThirdOneFree
 
 
 def test_create_product():
@@ -30,4 +31,23 @@ def test_buy_too_much():
         product.buy(101)
 
 
+def test_second_half_price_halves_every_second_item():
+    product = Product("Example Product", 50.0, 100)
+    promotion = SecondHalfPrice("Second Half price!")
+    assert promotion.apply_promotion(product, 1) == 50.0
+    assert promotion.apply_promotion(product, 2) == 75.0
+    assert promotion.apply_promotion(product, 3) == 125.0
+    assert promotion.apply_promotion(product, 4) == 150.0
+
+
+def test_third_one_free_gives_every_third_item_free():
+    product = Product("Example Product", 50.0, 100)
+    promotion = ThirdOneFree("Third One Free!")
+    assert promotion.apply_promotion(product, 2) == 100.0
+    assert promotion.apply_promotion(product, 3) == 100.0
+    assert promotion.apply_promotion(product, 4) == 150.0
+    assert promotion.apply_promotion(product, 5) == 200.0
+    assert promotion.apply_promotion(product, 6) == 200.0
+
+
 pytest.main()
@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+from products import Product
+from promotion_rules import PromotionCatalog, compile_rule
+from promotions import SecondHalfPrice, ThirdOneFree, PercentDiscount
+
+PRICES = [0, 1, 9.99, 10, 125, 250, 1450, 0.1]
+QUANTITIES = range(1, 25)
+
+
+@pytest.mark.parametrize("promotion, rule", [
+    (SecondHalfPrice("Second Half price!"), {"type": "nth_at_percent", "n": 2, "percent": 50}),
+    (ThirdOneFree("Third One Free!"), {"type": "every_nth_free", "n": 3}),
+    (PercentDiscount("30% off!", percent=30), {"type": "percent_off", "percent": 30}),
+])
+def test_compiled_rules_match_promotion_classes(promotion, rule):
+    pricer = compile_rule(rule)
+    for price in PRICES:
+        product = Product("Example Product", price, 100)
+        for quantity in QUANTITIES:
+            assert pricer(price, quantity) == promotion.apply_promotion(product, quantity)
+
+
+def test_tiered_rule_uses_highest_break_reached():
+    pricer = compile_rule({"type": "tiered", "tiers": [
+        {"min_quantity": 10, "percent": 10}, {"min_quantity": 5, "percent": 5}]})
+    assert pricer(100, 4) == 400
+    assert pricer(100, 5) == 475
+    assert pricer(100, 10) == 900
+
+
+def test_invalid_rule_raises():
+    with pytest.raises(ValueError):
+        compile_rule({"type": "every_nth_free", "n": 0})
+    with pytest.raises(ValueError):
+        compile_rule({"type": "buy_one_get_two"})
+
+
+def test_boolean_rule_parameters_raise():
+    with pytest.raises(ValueError):
+        compile_rule({"type": "percent_off", "percent": True})
+    with pytest.raises(ValueError):
+        compile_rule({"type": "every_nth_free", "n": True})
+
+
+def test_catalog_hot_reload_updates_products(tmp_path):
+    path = str(tmp_path / "promotions.json")
+    rule = {"id": "sale", "name": "Sale!", "type": "percent_off", "percent": 10,
+            "products": ["Example Product"]}
+    with open(path, "w") as file:
+        json.dump({"promotions": [rule]}, file)
+    catalog = PromotionCatalog(path)
+    product = Product("Example Product", 100, 100)
+    catalog.apply([product])
+    assert product.buy(1) == 90.0
+
+    rule["percent"] = 50
+    with open(path, "w") as file:
+        json.dump({"promotions": [rule]}, file)
+    os.utime(path, (0, 0))
+    assert catalog.reload_if_changed()
+    assert not catalog.reload_if_changed()
+    assert product.buy(1) == 50.0
+
+
+def test_catalog_reload_adds_and_removes_promotions(tmp_path):
+    path = str(tmp_path / "promotions.json")
+    rules = [{"id": "sale", "name": "Sale!", "type": "percent_off", "percent": 10,
+              "products": ["X"]}]
+    with open(path, "w") as file:
+        json.dump({"promotions": rules}, file)
+    catalog = PromotionCatalog(path)
+    x_product = Product("X", 100, 100)
+    y_product = Product("Y", 100, 100)
+    catalog.apply([x_product, y_product])
+    assert y_product.get_promotion() is None
+
+    rules[0]["products"] = ["Y"]
+    with open(path, "w") as file:
+        json.dump({"promotions": rules}, file)
+    catalog.reload()
+    assert x_product.get_promotion() is None
+    assert x_product.buy(1) == 100.0
+    assert y_product.buy(1) == 90.0
+
+
+def test_missing_config_raises_value_error(tmp_path):
+    path = tmp_path / "promotions.json"
+    path.write_text('{"promotions": []}')
+    catalog = PromotionCatalog(str(path))
+    path.unlink()
+    with pytest.raises(ValueError):
+        catalog.reload_if_changed()
+
+
+def test_catalog_loads_toml(tmp_path):
+    path = tmp_path / "promotions.toml"
+    path.write_text('[[promotions]]\nid = "free"\nname = "Third One Free!"\n'
+                    'type = "every_nth_free"\nn = 3\n')
+    catalog = PromotionCatalog(str(path))
+    assert catalog.get("free").get_name() == "Third One Free!"
+    assert catalog.get("free").apply_promotion(Product("Example Product", 10, 100), 3) == 20